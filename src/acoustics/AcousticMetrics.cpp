@@ -10,15 +10,12 @@ namespace AcousticMetrics {
 std::vector<float> computeSchroederCurve(const std::vector<float>& rir) {
     if (rir.empty()) return {};
 
-    std::vector<float> squared(rir.size());
-    for (size_t i = 0; i < rir.size(); ++i)
-        squared[i] = rir[i] * rir[i];
-
-    // Backward integration (Schroeder method)
+    // Backward integration (Schroeder method), squaring as we go
     std::vector<float> edc(rir.size());
     double runningSum = 0.0;
     for (int i = static_cast<int>(rir.size()) - 1; i >= 0; --i) {
-        runningSum += squared[i];
+        float squared = rir[i] * rir[i];
+        runningSum += squared;
         edc[i] = static_cast<float>(runningSum);
     }
 
@@ -30,14 +27,19 @@ std::vector<float> schroederCurveDb(const std::vector<float>& rir) {
     if (edc.empty()) return {};
 
     float maxVal = edc[0];
-    if (maxVal < 1e-30f) return std::vector<float>(edc.size(), -200.0f);
+    if (maxVal < 1e-30f) {
+        std::fill(edc.begin(), edc.end(), -200.0f);
+        return edc;
+    }
 
-    std::vector<float> edcDb(edc.size());
-    for (size_t i = 0; i < edc.size(); ++i) {
-        float ratio = edc[i] / maxVal;
-        edcDb[i] = (ratio > 1e-30f) ? 10.0f * std::log10(ratio) : -300.0f;
+    // Convert in place; the linear curve is not needed afterwards. The
+    // curve is already in energy units, so dB is one log10 per sample.
+    const float invMax = 1.0f / maxVal;
+    for (float& v : edc) {
+        float ratio = v * invMax;
+        v = (ratio > 1e-30f) ? 10.0f * std::log10(ratio) : -300.0f;
     }
-    return edcDb;
+    return edc;
 }
 
 static float fitRT(const std::vector<float>& edcDb, int sampleRate,
@@ -21,11 +21,14 @@ namespace {
 constexpr int   SIMPLIFICATION_THRESHOLD = 500;
 constexpr float SIMPLIFICATION_TARGET_RATIO = 0.3f;
 
+} // namespace
+
 std::vector<AcousticSurface> buildAcousticSurfaces(
     const std::vector<Viewport3D::WallInfo>& wallInfos,
     const std::vector<Vec3f>& modelVertices)
 {
     std::vector<AcousticSurface> surfaces;
+    surfaces.reserve(wallInfos.size());
     for (const auto& wi : wallInfos) {
         Vec3f normalSum = Vec3f::Zero();
         Vec3f centroidSum = Vec3f::Zero();
@@ -46,7 +49,7 @@ std::vector<AcousticSurface> buildAcousticSurfaces(
             float area = 0.5f * n.norm();
             if (area < 1e-8f) continue;
 
-            normalSum += n.normalized() * area;
+            normalSum += 0.5f * n;  // |n| is twice the area, so this is the area-weighted unit normal
             centroidSum += (v0 + v1 + v2) / 3.0f * area;
             totalArea += area;
             if (validCount == 0) firstPoint = v0;
@@ -67,7 +70,45 @@ std::vector<AcousticSurface> buildAcousticSurfaces(
     return surfaces;
 }
 
-} // namespace
+std::vector<Wall> buildWalls(
+    const std::vector<Viewport3D::WallInfo>& wallInfos,
+    const std::vector<Vec3f>& modelVertices,
+    std::vector<int>& wallSurfaceIds)
+{
+    size_t triCount = 0;
+    for (const auto& wi : wallInfos) triCount += wi.triangleIndices.size();
+
+    std::vector<Wall> walls;
+    walls.reserve(triCount);
+    wallSurfaceIds.clear();
+    wallSurfaceIds.reserve(triCount);
+
+    const int vertCount = static_cast<int>(modelVertices.size());
+    for (int surfaceIdx = 0; surfaceIdx < static_cast<int>(wallInfos.size()); ++surfaceIdx) {
+        const auto& wi = wallInfos[surfaceIdx];
+        for (int triIdx : wi.triangleIndices) {
+            int baseVert = triIdx * 3;
+            if (baseVert + 2 >= vertCount) continue;
+
+            Wall wall;
+            wall.triangle.v0 = modelVertices[baseVert];
+            wall.triangle.v1 = modelVertices[baseVert + 1];
+            wall.triangle.v2 = modelVertices[baseVert + 2];
+            Vec3f e1 = wall.triangle.v1 - wall.triangle.v0;
+            Vec3f e2 = wall.triangle.v2 - wall.triangle.v0;
+            Vec3f n = e1.cross(e2);
+            float doubleArea = n.norm();
+            if (!(0.5f * doubleArea > 1e-8f)) continue;
+
+            wall.triangle.normal = n / doubleArea;
+            wall.absorption = wi.absorption;
+            wall.scattering = wi.scattering;
+            walls.push_back(wall);
+            wallSurfaceIds.push_back(surfaceIdx);
+        }
+    }
+    return walls;
+}
 
 AcousticSimulator::AcousticSimulator(int sampleRate)
     : sampleRate_(sampleRate) {}
@@ -105,31 +146,8 @@ QString AcousticSimulator::simulateScene(
     QElapsedTimer phaseTimer;
     phaseTimer.start();
 
-    std::vector<Wall> walls;
     std::vector<int> wallSurfaceIds;
-    int surfaceIdx = 0;
-    for (auto& wi : wallsFromRender) {
-        for (int triIdx : wi.triangleIndices) {
-            int baseVert = triIdx * 3;
-            if (baseVert + 2 >= static_cast<int>(modelVertices.size())) continue;
-
-            Wall wall;
-            wall.triangle.v0     = modelVertices[baseVert];
-            wall.triangle.v1     = modelVertices[baseVert + 1];
-            wall.triangle.v2     = modelVertices[baseVert + 2];
-            Vec3f e1 = wall.triangle.v1 - wall.triangle.v0;
-            Vec3f e2 = wall.triangle.v2 - wall.triangle.v0;
-            wall.triangle.normal = e1.cross(e2).normalized();
-            wall.absorption = wi.absorption;
-            wall.scattering = wi.scattering;
-
-            if (wall.area() > 1e-8f) {
-                walls.push_back(wall);
-                wallSurfaceIds.push_back(surfaceIdx);
-            }
-        }
-        surfaceIdx++;
-    }
+    std::vector<Wall> walls = buildWalls(wallsFromRender, modelVertices, wallSurfaceIds);
 
     qInfo() << "Built" << walls.size() << "wall triangles in" << phaseTimer.elapsed() << "ms";
 
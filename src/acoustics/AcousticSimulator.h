@@ -3,6 +3,7 @@
 #include "core/Types.h"
 #include "scene/SceneManager.h"
 #include "rendering/Viewport3D.h"
+#include "Wall.h"
 
 #include <QString>
 #include <vector>
@@ -10,6 +11,19 @@
 
 namespace prs {
 
+// Area-weighted normal, centroid and total area of each render surface.
+// Shared by the synchronous simulator and the background worker.
+std::vector<AcousticSurface> buildAcousticSurfaces(
+    const std::vector<Viewport3D::WallInfo>& wallInfos,
+    const std::vector<Vec3f>& modelVertices);
+
+// One wall per non-degenerate render triangle; wallSurfaceIds receives the
+// index of the surface each wall came from
+std::vector<Wall> buildWalls(
+    const std::vector<Viewport3D::WallInfo>& wallInfos,
+    const std::vector<Vec3f>& modelVertices,
+    std::vector<int>& wallSurfaceIds);
+
 class AcousticSimulator {
 public:
     AcousticSimulator(int sampleRate = DEFAULT_SAMPLE_RATE);
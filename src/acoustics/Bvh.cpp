@@ -15,24 +15,61 @@ AABB Bvh::triangleBounds(const Triangle& tri) {
     return box;
 }
 
+void Bvh::setPrimTriangle(int idx, const Triangle& tri) {
+    primBounds_[idx] = triangleBounds(tri);
+    primV0_[idx] = tri.v0;
+    primEdge1_[idx] = tri.v1 - tri.v0;
+    primEdge2_[idx] = tri.v2 - tri.v0;
+}
+
 void Bvh::build(const std::vector<Wall>& walls) {
-    walls_ = &walls;
     int n = static_cast<int>(walls.size());
+    primBounds_.resize(n);
+    primV0_.resize(n);
+    primEdge1_.resize(n);
+    primEdge2_.resize(n);
+    for (int i = 0; i < n; ++i)
+        setPrimTriangle(i, walls[i].triangle);
+    buildNodes();
+}
+
+void Bvh::build(const std::vector<Triangle>& triangles) {
+    int n = static_cast<int>(triangles.size());
+    primBounds_.resize(n);
+    primV0_.resize(n);
+    primEdge1_.resize(n);
+    primEdge2_.resize(n);
+    for (int i = 0; i < n; ++i)
+        setPrimTriangle(i, triangles[i]);
+    buildNodes();
+}
+
+void Bvh::buildNodes() {
+    nodes_.clear();
+    int n = static_cast<int>(primBounds_.size());
     if (n == 0) return;
 
     primIndices_.resize(n);
-    primBounds_.resize(n);
     primCentroids_.resize(n);
 
     for (int i = 0; i < n; ++i) {
         primIndices_[i] = i;
-        primBounds_[i] = triangleBounds(walls[i].triangle);
         primCentroids_[i] = (primBounds_[i].min + primBounds_[i].max) * 0.5f;
     }
 
     nodes_.reserve(2 * n);
     nodes_.push_back(BvhNode{});
     buildRecursive(0, 0, n);
+
+    auto permute = [this, n](std::vector<Vec3f>& data) {
+        std::vector<Vec3f> ordered(n);
+        for (int i = 0; i < n; ++i)
+            ordered[i] = data[primIndices_[i]];
+        data.swap(ordered);
+    };
+    permute(primV0_);
+    permute(primEdge1_);
+    permute(primEdge2_);
 }
 
 void Bvh::buildRecursive(int nodeIdx, int start, int end) {
@@ -151,7 +188,8 @@ void Bvh::buildRecursive(int nodeIdx, int start, int end) {
 }
 
 bool Bvh::intersectAABB(const Vec3f& origin, const Vec3f& invDir,
-                         const AABB& box, float tMin, float tMax) const {
+                         const AABB& box, float tMin, float tMax,
+                         float* tEntry) const {
     for (int i = 0; i < 3; ++i) {
         float t1 = (box.min[i] - origin[i]) * invDir[i];
         float t2 = (box.max[i] - origin[i]) * invDir[i];
@@ -160,6 +198,7 @@ bool Bvh::intersectAABB(const Vec3f& origin, const Vec3f& invDir,
         tMax = std::min(tMax, t2);
         if (tMin > tMax) return false;
     }
+    if (tEntry) *tEntry = tMin;
     return true;
 }
 
@@ -169,30 +208,52 @@ BvhHit Bvh::closestHit(const Vec3f& origin, const Vec3f& dir, float tMin) const
 
     Vec3f invDir(1.0f / dir.x(), 1.0f / dir.y(), 1.0f / dir.z());
 
-    // Stack-based traversal
-    int stack[64];
+    // Stack-based traversal, nearer child first so the best t shrinks early
+    // and prunes the far subtree.
+    struct StackEntry { int node; float tEntry; };
+    StackEntry stack[64];
     int stackPtr = 0;
-    stack[stackPtr++] = 0;
 
-    while (stackPtr > 0) {
-        int nodeIdx = stack[--stackPtr];
-        const BvhNode& node = nodes_[nodeIdx];
+    float rootEntry;
+    if (!intersectAABB(origin, invDir, nodes_[0].bounds, tMin, result.t, &rootEntry))
+        return result;
+    stack[stackPtr++] = {0, rootEntry};
 
-        if (!intersectAABB(origin, invDir, node.bounds, tMin, result.t))
+    while (stackPtr > 0) {
+        const StackEntry entry = stack[--stackPtr];
+        if (entry.tEntry > result.t)
             continue;
 
+        const BvhNode& node = nodes_[entry.node];
+
         if (node.isLeaf()) {
-            for (int i = 0; i < node.primCount; ++i) {
-                int wallIdx = primIndices_[node.firstPrim + i];
-                auto t = RayPicking::rayTriangleIntersect(origin, dir, (*walls_)[wallIdx].triangle);
+            for (int slot = node.firstPrim; slot < node.firstPrim + node.primCount; ++slot) {
+                auto t = RayPicking::rayTriangleIntersect(
+                    origin, dir, primV0_[slot], primEdge1_[slot], primEdge2_[slot]);
                 if (t && *t > tMin && *t < result.t) {
                     result.t = *t;
-                    result.wallIndex = wallIdx;
+                    result.wallIndex = primIndices_[slot];
                 }
             }
         } else {
-            stack[stackPtr++] = node.leftChild;
-            stack[stackPtr++] = node.rightChild;
+            float tLeft, tRight;
+            bool hitLeft  = intersectAABB(origin, invDir, nodes_[node.leftChild].bounds,
+                                          tMin, result.t, &tLeft);
+            bool hitRight = intersectAABB(origin, invDir, nodes_[node.rightChild].bounds,
+                                          tMin, result.t, &tRight);
+            if (hitLeft && hitRight) {
+                if (tLeft <= tRight) {
+                    stack[stackPtr++] = {node.rightChild, tRight};
+                    stack[stackPtr++] = {node.leftChild, tLeft};
+                } else {
+                    stack[stackPtr++] = {node.leftChild, tLeft};
+                    stack[stackPtr++] = {node.rightChild, tRight};
+                }
+            } else if (hitLeft) {
+                stack[stackPtr++] = {node.leftChild, tLeft};
+            } else if (hitRight) {
+                stack[stackPtr++] = {node.rightChild, tRight};
+            }
         }
     }
 
@@ -217,9 +278,9 @@ bool Bvh::anyHit(const Vec3f& origin, const Vec3f& dir,
             continue;
 
         if (node.isLeaf()) {
-            for (int i = 0; i < node.primCount; ++i) {
-                int wallIdx = primIndices_[node.firstPrim + i];
-                auto t = RayPicking::rayTriangleIntersect(origin, dir, (*walls_)[wallIdx].triangle);
+            for (int slot = node.firstPrim; slot < node.firstPrim + node.primCount; ++slot) {
+                auto t = RayPicking::rayTriangleIntersect(
+                    origin, dir, primV0_[slot], primEdge1_[slot], primEdge2_[slot]);
                 if (t && *t > tMin && *t < tMax)
                     return true;
             }
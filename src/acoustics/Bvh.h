@@ -63,6 +63,9 @@ struct BvhHit {
 class Bvh {
 public:
     void build(const std::vector<Wall>& walls);
+    // Builds over bare triangles (e.g. for viewport picking); hits report the
+    // triangle index in wallIndex.
+    void build(const std::vector<Triangle>& triangles);
 
     BvhHit closestHit(const Vec3f& origin, const Vec3f& dir,
                        float tMin = 1e-4f) const;
@@ -78,16 +81,24 @@ private:
     static constexpr float TRAVERSAL_COST = 1.0f;
     static constexpr float INTERSECT_COST = 1.0f;
 
+    void buildNodes();
     void buildRecursive(int nodeIdx, int start, int end);
     static AABB triangleBounds(const Triangle& tri);
     bool intersectAABB(const Vec3f& origin, const Vec3f& invDir,
-                       const AABB& box, float tMin, float tMax) const;
+                       const AABB& box, float tMin, float tMax,
+                       float* tEntry = nullptr) const;
+    void setPrimTriangle(int idx, const Triangle& tri);
 
     std::vector<BvhNode> nodes_;
     std::vector<int> primIndices_;
     std::vector<AABB> primBounds_;
     std::vector<Vec3f> primCentroids_;
-    const std::vector<Wall>* walls_ = nullptr;
+
+    // Intersection data, contiguous and stored in leaf order (slot i holds
+    // primitive primIndices_[i]) so a leaf's triangles are adjacent in memory.
+    std::vector<Vec3f> primV0_;
+    std::vector<Vec3f> primEdge1_;
+    std::vector<Vec3f> primEdge2_;
 };
 
 } // namespace prs
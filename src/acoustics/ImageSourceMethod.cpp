@@ -1,5 +1,4 @@
 #include "ImageSourceMethod.h"
-#include "rendering/RayPicking.h"
 #include <cmath>
 #include <algorithm>
 
@@ -24,7 +23,12 @@ std::vector<ImageSource> ImageSourceMethod::compute(
     std::array<float, NUM_FREQ_BANDS> unity;
     unity.fill(1.0f);
 
-    if (isVisible(sourcePos, listenerPos, walls)) {
+    // Every candidate is tested against the same walls, so build the
+    // occlusion BVH (with precomputed triangle edges) once up front.
+    Bvh bvh;
+    bvh.build(walls);
+
+    if (isVisible(sourcePos, listenerPos, bvh)) {
         float dist = (listenerPos - sourcePos).norm();
         ImageSource direct;
         direct.position = sourcePos;
@@ -43,7 +47,7 @@ std::vector<ImageSource> ImageSourceMethod::compute(
             valid.push_back(is);
             continue;
         }
-        if (isVisible(is.position, listenerPos, walls)) {
+        if (isVisible(is.position, listenerPos, bvh)) {
             float dist = (listenerPos - is.position).norm();
             float invDist = 1.0f / std::max(dist, 0.001f);
             for (int b = 0; b < NUM_FREQ_BANDS; ++b)
@@ -92,22 +96,6 @@ void ImageSourceMethod::generateImageSources(
     }
 }
 
-bool ImageSourceMethod::isVisible(const Vec3f& from, const Vec3f& to,
-                                   const std::vector<Wall>& walls) const {
-    Vec3f dir = to - from;
-    float maxDist = dir.norm();
-    if (maxDist < 1e-8f) return true;
-    dir /= maxDist;
-
-    for (auto& wall : walls) {
-        auto t = RayPicking::rayTriangleIntersect(from, dir, wall.triangle);
-        if (t && *t > 1e-4f && *t < maxDist - 1e-4f) {
-            return false;
-        }
-    }
-    return true;
-}
-
 // Surface-level ISM with BVH visibility
 
 std::vector<ImageSource> ImageSourceMethod::compute(
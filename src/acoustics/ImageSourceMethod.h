@@ -50,9 +50,6 @@ private:
         const std::vector<int>& path,
         std::vector<ImageSource>& results);
 
-    bool isVisible(const Vec3f& from, const Vec3f& to,
-                   const std::vector<Wall>& walls) const;
-
     bool isVisible(const Vec3f& from, const Vec3f& to,
                    const Bvh& bvh) const;
 };
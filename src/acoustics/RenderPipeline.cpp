@@ -39,7 +39,7 @@ std::vector<Viewport3D::WallInfo> buildWalls(const MeshData& mesh, const Project
 
     for (int si = 0; si < static_cast<int>(surfaces.size()); ++si) {
         Viewport3D::WallInfo wi;
-        wi.triangleIndices.assign(surfaces[si].begin(), surfaces[si].end());
+        wi.triangleIndices = surfaces[si];
         if (si < static_cast<int>(project.surfaceMaterials.size()) && project.surfaceMaterials[si].has_value()) {
             wi.absorption = project.surfaceMaterials[si]->absorption;
             wi.scattering = project.surfaceMaterials[si]->scattering;
@@ -1,4 +1,5 @@
 #include "SimulationWorker.h"
+#include "AcousticSimulator.h"
 #include "Wall.h"
 #include "Bvh.h"
 #include "ImageSourceMethod.h"
@@ -62,52 +63,6 @@ std::vector<ImageSource> filterByHeadOcclusion(const std::vector<ImageSource>& s
     return out;
 }
 
-std::vector<AcousticSurface> buildAcousticSurfaces(
-    const std::vector<Viewport3D::WallInfo>& wallInfos,
-    const std::vector<Vec3f>& modelVertices)
-{
-    std::vector<AcousticSurface> surfaces;
-    for (const auto& wi : wallInfos) {
-        Vec3f normalSum = Vec3f::Zero();
-        Vec3f centroidSum = Vec3f::Zero();
-        float totalArea = 0.0f;
-        int validCount = 0;
-        Vec3f firstPoint = Vec3f::Zero();
-
-        for (int triIdx : wi.triangleIndices) {
-            int base = triIdx * 3;
-            if (base + 2 >= static_cast<int>(modelVertices.size())) continue;
-
-            Vec3f v0 = modelVertices[base];
-            Vec3f v1 = modelVertices[base + 1];
-            Vec3f v2 = modelVertices[base + 2];
-            Vec3f e1 = v1 - v0;
-            Vec3f e2 = v2 - v0;
-            Vec3f n = e1.cross(e2);
-            float area = 0.5f * n.norm();
-            if (area < 1e-8f) continue;
-
-            normalSum += n.normalized() * area;
-            centroidSum += (v0 + v1 + v2) / 3.0f * area;
-            totalArea += area;
-            if (validCount == 0) firstPoint = v0;
-            validCount++;
-        }
-
-        if (totalArea < 1e-8f) continue;
-
-        AcousticSurface s;
-        s.normal = normalSum.normalized();
-        s.centroid = centroidSum / totalArea;
-        s.planePoint = firstPoint;
-        s.area = totalArea;
-        s.absorption = wi.absorption;
-        s.scattering = wi.scattering;
-        surfaces.push_back(s);
-    }
-    return surfaces;
-}
-
 } // namespace
 
 SimulationWorker::SimulationWorker(const Params& params, QObject* parent)
@@ -132,31 +87,8 @@ void SimulationWorker::process() {
     phaseTimer.start();
 
     // Build walls with surface IDs for potential simplification
-    std::vector<Wall> walls;
     std::vector<int> wallSurfaceIds;
-    int surfaceIdx = 0;
-    for (auto& wi : params_.walls) {
-        for (int triIdx : wi.triangleIndices) {
-            int baseVert = triIdx * 3;
-            if (baseVert + 2 >= static_cast<int>(params_.modelVertices.size())) continue;
-
-            Wall wall;
-            wall.triangle.v0 = params_.modelVertices[baseVert];
-            wall.triangle.v1 = params_.modelVertices[baseVert + 1];
-            wall.triangle.v2 = params_.modelVertices[baseVert + 2];
-            Vec3f e1 = wall.triangle.v1 - wall.triangle.v0;
-            Vec3f e2 = wall.triangle.v2 - wall.triangle.v0;
-            wall.triangle.normal = e1.cross(e2).normalized();
-            wall.absorption = wi.absorption;
-            wall.scattering = wi.scattering;
-
-            if (wall.area() > 1e-8f) {
-                walls.push_back(wall);
-                wallSurfaceIds.push_back(surfaceIdx);
-            }
-        }
-        surfaceIdx++;
-    }
+    std::vector<Wall> walls = buildWalls(params_.walls, params_.modelVertices, wallSurfaceIds);
 
     qInfo() << "Built" << walls.size() << "wall triangles in" << phaseTimer.elapsed() << "ms";
 
@@ -363,8 +295,16 @@ void SimulationWorker::process() {
             auto impulseLeft  = SignalProcessing::combineMultibandRIR(multibandLeft,  fs);
             auto impulseRight = SignalProcessing::combineMultibandRIR(multibandRight, fs);
 
-            auto outLeft  = SignalProcessing::fftConvolve(inputSamples, impulseLeft);
-            auto outRight = SignalProcessing::fftConvolve(inputSamples, impulseRight);
+            // The two ear convolutions are independent and dominate this
+            // phase for long inputs, so run them side by side
+            std::vector<float> outLeft, outRight;
+            #pragma omp parallel sections num_threads(2)
+            {
+                #pragma omp section
+                outLeft = SignalProcessing::fftConvolve(inputSamples, impulseLeft);
+                #pragma omp section
+                outRight = SignalProcessing::fftConvolve(inputSamples, impulseRight);
+            }
             qInfo() << "  RIR + convolution:" << phaseTimer.elapsed() << "ms";
 
             auto rtResult = AcousticMetrics::computeRT(impulseLeft, fs);
@@ -423,9 +363,9 @@ void SimulationWorker::process() {
     if (scene.soundSourceCount() > 1) {
         for (int li : listenerIndices) {
             auto* listener = scene.getListener(li);
-            if (!listener || mixedPerListener.find(li) == mixedPerListener.end()
-                || mixedPerListener[li].left.empty()) continue;
-            MixedStereo& m = mixedPerListener[li];
+            auto it = mixedPerListener.find(li);
+            if (!listener || it == mixedPerListener.end() || it->second.left.empty()) continue;
+            MixedStereo& m = it->second;
             float maxVal = 0.0f;
             for (float s : m.left)  maxVal = std::max(maxVal, std::abs(s));
             for (float s : m.right) maxVal = std::max(maxVal, std::abs(s));
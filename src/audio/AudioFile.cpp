@@ -77,62 +77,94 @@ bool AudioFile::saveStereo(const QString& filepath, int sampleRate,
 
 // Minimal WAV reader/writer when libsndfile is not available
 
+namespace {
+
+// Header fields sit at arbitrary offsets in the file; memcpy keeps the
+// loads alignment- and aliasing-safe
+template <typename T>
+T readField(const char* p) {
+    T value;
+    std::memcpy(&value, p, sizeof(T));
+    return value;
+}
+
+} // namespace
+
 bool AudioFile::load(const QString& filepath) {
     QFile file(filepath);
     if (!file.open(QIODevice::ReadOnly)) return false;
 
-    QByteArray data = file.readAll();
-    file.close();
-
-    if (data.size() < 44) return false;
-
-    const char* ptr = data.constData();
+    const qint64 size = file.size();
+    if (size < 44) return false;
+
+    // Map the file rather than copying it; the mapping lives until `file`
+    // is destroyed. Fall back to reading when mapping is unsupported.
+    QByteArray data;
+    const char* ptr = reinterpret_cast<const char*>(file.map(0, size));
+    if (!ptr) {
+        data = file.readAll();
+        if (data.size() < size) return false;
+        ptr = data.constData();
+    }
 
     // Validate RIFF header
     if (std::memcmp(ptr, "RIFF", 4) != 0) return false;
     if (std::memcmp(ptr + 8, "WAVE", 4) != 0) return false;
 
     // Find fmt chunk
-    int pos = 12;
+    qint64 pos = 12;
     int16_t audioFormat = 0;
     int16_t numChannels = 0;
     int32_t sr = 0;
     int16_t bitsPerSample = 0;
 
-    while (pos < data.size() - 8) {
+    while (pos + 8 <= size) {
         char chunkId[5] = {};
         std::memcpy(chunkId, ptr + pos, 4);
-        int32_t chunkSize = *reinterpret_cast<const int32_t*>(ptr + pos + 4);
+        int32_t chunkSize = readField<int32_t>(ptr + pos + 4);
+        if (chunkSize < 0) return false;
+
+        // Never read past the end of the file, whatever the header claims
+        const qint64 available = size - (pos + 8);
 
         if (std::strcmp(chunkId, "fmt ") == 0) {
-            audioFormat   = *reinterpret_cast<const int16_t*>(ptr + pos + 8);
-            numChannels   = *reinterpret_cast<const int16_t*>(ptr + pos + 10);
-            sr            = *reinterpret_cast<const int32_t*>(ptr + pos + 12);
-            bitsPerSample = *reinterpret_cast<const int16_t*>(ptr + pos + 22);
+            if (chunkSize < 16 || available < 16) return false;
+            audioFormat   = readField<int16_t>(ptr + pos + 8);
+            numChannels   = readField<int16_t>(ptr + pos + 10);
+            sr            = readField<int32_t>(ptr + pos + 12);
+            bitsPerSample = readField<int16_t>(ptr + pos + 22);
         } else if (std::strcmp(chunkId, "data") == 0) {
+            int bytesPerSample = bitsPerSample / 8;
+            if (numChannels <= 0 || bytesPerSample <= 0) return false;
+
             sampleRate_ = sr;
             channels_   = numChannels;
 
-            int bytesPerSample = bitsPerSample / 8;
-            int totalSamples   = chunkSize / bytesPerSample;
+            const qint64 dataBytes = std::min<qint64>(chunkSize, available);
+            int totalSamples = static_cast<int>(dataBytes / bytesPerSample);
             samples_.resize(totalSamples);
 
             const char* samplePtr = ptr + pos + 8;
 
+            // memcpy loads are alignment-safe and compile to plain loads,
+            // so these loops vectorize; float data is copied in one go
             if (bitsPerSample == 16) {
+                constexpr float scale = 1.0f / 32768.0f;
                 for (int i = 0; i < totalSamples; ++i) {
-                    int16_t val = *reinterpret_cast<const int16_t*>(samplePtr + i * 2);
-                    samples_[i] = val / 32768.0f;
+                    int16_t val;
+                    std::memcpy(&val, samplePtr + i * 2, sizeof(val));
+                    samples_[i] = val * scale;
                 }
             } else if (bitsPerSample == 32 && audioFormat == 1) {
+                constexpr float scale = 1.0f / 2147483648.0f;
                 for (int i = 0; i < totalSamples; ++i) {
-                    int32_t val = *reinterpret_cast<const int32_t*>(samplePtr + i * 4);
-                    samples_[i] = val / 2147483648.0f;
+                    int32_t val;
+                    std::memcpy(&val, samplePtr + i * 4, sizeof(val));
+                    samples_[i] = val * scale;
                 }
             } else if (bitsPerSample == 32 && audioFormat == 3) {
-                for (int i = 0; i < totalSamples; ++i) {
-                    samples_[i] = *reinterpret_cast<const float*>(samplePtr + i * 4);
-                }
+                if (totalSamples > 0)
+                    std::memcpy(samples_.data(), samplePtr, totalSamples * sizeof(float));
             } else {
                 return false;
             }
@@ -239,19 +271,24 @@ bool AudioFile::saveStereo(const QString& filepath, int sampleRate,
 void AudioFile::convertToMono() {
     if (channels_ <= 1) return;
 
+    // Frame i is read from index i * channels_ >= i, so the average can be
+    // written back into the same buffer; the multichannel capacity is then
+    // released so the file does not keep it resident
     int frames = static_cast<int>(samples_.size()) / channels_;
-    std::vector<float> mono(frames);
+    const float invChannels = 1.0f / static_cast<float>(channels_);
     for (int i = 0; i < frames; ++i) {
         float sum = 0.0f;
         for (int c = 0; c < channels_; ++c)
             sum += samples_[i * channels_ + c];
-        mono[i] = sum / channels_;
+        samples_[i] = sum * invChannels;
     }
-    samples_ = std::move(mono);
+    samples_.resize(frames);
+    samples_.shrink_to_fit();
     channels_ = 1;
 }
 
 void AudioFile::applyVolume(float volume) {
+    if (volume == 1.0f) return;
     for (auto& s : samples_)
         s *= volume;
 }
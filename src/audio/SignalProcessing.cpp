@@ -1,8 +1,8 @@
 #include <cmath>
 #include <algorithm>
 #include <complex>
-#include <valarray>
 #include <array>
+#include <memory>
 
 #include "SignalProcessing.h"
 #include "core/Material.h"
@@ -37,32 +37,133 @@ std::vector<float> convolve(const std::vector<float>& signal,
     return result;
 }
 
-// Simple radix-2 Cooley-Tukey FFT
+// Iterative radix-2 Cooley-Tukey FFT. The twiddle factors for a size are
+// computed once and shared by every transform of that size, instead of
+// being re-derived at each recursion level.
 using Complex = std::complex<float>;
 
-static void fft(std::valarray<Complex>& x) {
-    size_t N = x.size();
-    if (N <= 1) return;
+namespace {
 
-    std::valarray<Complex> even = x[std::slice(0, N/2, 2)];
-    std::valarray<Complex> odd  = x[std::slice(1, N/2, 2)];
+struct FftPlan {
+    explicit FftPlan(size_t size) : n(size), twiddles(size / 2) {
+        for (size_t k = 0; k < n / 2; ++k) {
+            double angle = -2.0 * M_PI * static_cast<double>(k) / static_cast<double>(n);
+            twiddles[k] = Complex(static_cast<float>(std::cos(angle)), static_cast<float>(std::sin(angle)));
+        }
+    }
 
-    fft(even);
-    fft(odd);
+    void forward(Complex* x) const {
+        // Bit-reversal permutation, carrying the reversed counter j along
+        // instead of storing a table
+        for (size_t i = 1, j = 0; i < n; ++i) {
+            size_t bit = n >> 1;
+            for (; j & bit; bit >>= 1) j ^= bit;
+            j ^= bit;
+            if (i < j) std::swap(x[i], x[j]);
+        }
 
-    for (size_t k = 0; k < N/2; ++k) {
-        Complex t = std::polar(1.0f, -2.0f * static_cast<float>(M_PI) * k / N) * odd[k];
-        x[k]       = even[k] + t;
-        x[k + N/2] = even[k] - t;
+        for (size_t len = 2; len <= n; len <<= 1) {
+            const size_t half = len / 2;
+            const size_t stride = n / len;
+            for (size_t start = 0; start < n; start += len) {
+                for (size_t k = 0; k < half; ++k) {
+                    Complex t = twiddles[k * stride] * x[start + k + half];
+                    Complex u = x[start + k];
+                    x[start + k]        = u + t;
+                    x[start + k + half] = u - t;
+                }
+            }
+        }
+    }
+
+    void inverse(Complex* x) const {
+        for (size_t i = 0; i < n; ++i) x[i] = std::conj(x[i]);
+        forward(x);
+        const float scale = 1.0f / static_cast<float>(n);
+        for (size_t i = 0; i < n; ++i) x[i] = std::conj(x[i]) * scale;
+    }
+
+    size_t n;
+    std::vector<Complex> twiddles;
+};
+
+// Transform of a real sequence of (even) length n via a complex FFT of
+// length n/2: even samples go in the real part, odd samples in the
+// imaginary part, and the two half spectra are separated afterwards.
+// Only the n/2 + 1 non-redundant bins are produced and consumed.
+struct RealFftPlan {
+    explicit RealFftPlan(size_t size) : n(size), half(size / 2), rotation(size / 4 + 1) {
+        for (size_t k = 0; k < rotation.size(); ++k) {
+            double angle = -2.0 * M_PI * static_cast<double>(k) / static_cast<double>(n);
+            rotation[k] = Complex(static_cast<float>(std::cos(angle)), static_cast<float>(std::sin(angle)));
+        }
+    }
+
+    // spectrum receives n/2 + 1 bins
+    void forward(const std::vector<float>& x, std::vector<Complex>& spectrum) const {
+        const size_t h = half.n;
+        spectrum.assign(h + 1, Complex(0.0f, 0.0f));
+        for (size_t i = 0; i < x.size() && i < n; ++i) {
+            if (i & 1) spectrum[i >> 1].imag(x[i]);
+            else       spectrum[i >> 1].real(x[i]);
+        }
+        half.forward(spectrum.data());
+
+        // X[k] = E[k] + W^k O[k], with E/O the even/odd sample spectra and
+        // W^(h-k) = -conj(W^k); bins k and h-k are recovered together
+        const Complex halfI(0.0f, -0.5f);
+        for (size_t k = 0; k <= h / 2; ++k) {
+            const size_t m = h - k;
+            const Complex zk = spectrum[k];
+            const Complex zm = spectrum[m == h ? 0 : m];
+            const Complex w = rotation[k];
+            spectrum[k] = 0.5f * (zk + std::conj(zm)) + w * (zk - std::conj(zm)) * halfI;
+            spectrum[m] = 0.5f * (zm + std::conj(zk)) - std::conj(w) * (zm - std::conj(zk)) * halfI;
+        }
     }
-}
 
-static void ifft(std::valarray<Complex>& x) {
-    for (auto& v : x) v = std::conj(v);
-    fft(x);
-    for (auto& v : x) v = std::conj(v) / static_cast<float>(x.size());
+    // Consumes the n/2 + 1 bins in spectrum and writes up to n samples
+    void inverse(std::vector<Complex>& spectrum, std::vector<float>& out) const {
+        const size_t h = half.n;
+        const Complex halfI(0.0f, 0.5f);
+        for (size_t k = 0; k <= h / 2; ++k) {
+            const size_t m = h - k;
+            const Complex pk = spectrum[k];
+            const Complex pm = spectrum[m];
+            const Complex w = std::conj(rotation[k]);
+            spectrum[k] = 0.5f * (pk + std::conj(pm)) + w * (pk - std::conj(pm)) * halfI;
+            if (m < h)
+                spectrum[m] = 0.5f * (pm + std::conj(pk)) - std::conj(w) * (pm - std::conj(pk)) * halfI;
+        }
+        half.inverse(spectrum.data());
+
+        for (size_t i = 0; i < out.size() && i < n; ++i)
+            out[i] = (i & 1) ? spectrum[i >> 1].imag() : spectrum[i >> 1].real();
+    }
+
+    size_t n;
+    FftPlan half;
+    std::vector<Complex> rotation;
+};
+
+// A plan holds about 4 bytes per transform point
+constexpr size_t MAX_CACHED_PLAN_SIZE = size_t(1) << 20;
+
+// Convolutions in a simulation run mostly repeat the same transform size
+// (one source against every listener's impulse responses), so each thread
+// keeps its most recent plan rather than rebuilding the tables per call.
+// Plans for very long transforms are built per call and not kept, so pool
+// threads do not pin large tables for the rest of the process.
+std::shared_ptr<const RealFftPlan> planFor(size_t size) {
+    thread_local std::shared_ptr<const RealFftPlan> cached;
+    if (cached && cached->n == size) return cached;
+    auto plan = std::make_shared<const RealFftPlan>(size);
+    if (size <= MAX_CACHED_PLAN_SIZE) cached = plan;
+    return plan;
 }
 
+} // namespace
+
 static size_t nextPow2(size_t n) {
     size_t p = 1;
     while (p < n) p <<= 1;
@@ -73,31 +174,20 @@ std::vector<float> fftConvolve(const std::vector<float>& signal,
                                const std::vector<float>& impulse) {
     if (signal.empty() || impulse.empty()) return {};
 
-#ifdef HAS_FFTW3
-    // FFTW-based implementation can be added here for better performance
-    return convolve(signal, impulse);
-#endif
-
     size_t outLen = signal.size() + impulse.size() - 1;
-    size_t fftLen = nextPow2(outLen);
-
-    std::valarray<Complex> sigFFT(fftLen);
-    std::valarray<Complex> impFFT(fftLen);
-
-    for (size_t i = 0; i < signal.size(); ++i)
-        sigFFT[i] = Complex(signal[i], 0.0f);
-    for (size_t i = 0; i < impulse.size(); ++i)
-        impFFT[i] = Complex(impulse[i], 0.0f);
+    size_t fftLen = std::max<size_t>(nextPow2(outLen), 2);
 
-    fft(sigFFT);
-    fft(impFFT);
+    auto plan = planFor(fftLen);
+    std::vector<Complex> sigFFT;
+    std::vector<Complex> impFFT;
+    plan->forward(signal, sigFFT);
+    plan->forward(impulse, impFFT);
 
-    std::valarray<Complex> product = sigFFT * impFFT;
-    ifft(product);
+    for (size_t k = 0; k < sigFFT.size(); ++k)
+        sigFFT[k] *= impFFT[k];
 
     std::vector<float> result(outLen);
-    for (size_t i = 0; i < outLen; ++i)
-        result[i] = product[i].real();
+    plan->inverse(sigFFT, result);
 
     return result;
 }
@@ -15,12 +15,14 @@ void Camera::orbit(float dx, float dy) {
     heading_ -= dx * 0.5f;
     pitch_   += dy * 0.5f;
     pitch_ = std::clamp(pitch_, -89.0f, 89.0f);
+    viewDirty_ = true;
 }
 
 void Camera::zoom(float delta, float modelSize) {
     float step = 0.1f * modelSize;
     distance_ -= delta * step;
     distance_ = std::clamp(distance_, minDist_, maxDist_);
+    viewDirty_ = true;
 }
 
 void Camera::reset(float modelSize) {
@@ -29,6 +31,7 @@ void Camera::reset(float modelSize) {
     distance_ = 2.5f * modelSize;
     minDist_  = 0.2f * modelSize;
     maxDist_  = 5.0f * modelSize;
+    viewDirty_ = true;
 }
 
 void Camera::setDistanceLimits(float minDist, float maxDist) {
@@ -39,18 +42,39 @@ void Camera::setDistanceLimits(float minDist, float maxDist) {
 Vec3f Camera::eyePosition() const {
     float hr = heading_ * static_cast<float>(M_PI) / 180.0f;
     float pr = pitch_   * static_cast<float>(M_PI) / 180.0f;
-    float x =  distance_ * std::sin(hr) * std::cos(pr);
-    float y = -distance_ * std::cos(hr) * std::cos(pr);
-    float z =  distance_ * std::sin(pr);
-    return Vec3f(x, y, z);
+    float ch = std::cos(hr), sh = std::sin(hr);
+    float cp = std::cos(pr), sp = std::sin(pr);
+    return distance_ * Vec3f(sh * cp, -ch * cp, sp);
+}
+
+const Mat4f& Camera::viewMatrix() const {
+    if (viewDirty_) {
+        // Same matrix gluLookAt(eye, origin, +Z) builds. The basis follows
+        // from the angles directly: pitch stays within +-89 degrees, so
+        // cos(pitch) > 0 and f x Z normalizes to (cos h, sin h, 0).
+        float hr = heading_ * static_cast<float>(M_PI) / 180.0f;
+        float pr = pitch_   * static_cast<float>(M_PI) / 180.0f;
+        float ch = std::cos(hr), sh = std::sin(hr);
+        float cp = std::cos(pr), sp = std::sin(pr);
+        Vec3f f(-sh * cp, ch * cp, -sp);
+        Vec3f eye = -distance_ * f;
+        Vec3f s(ch, sh, 0.0f);
+        Vec3f u = s.cross(f);
+
+        view_.setIdentity();
+        view_.block<1, 3>(0, 0) = s.transpose();
+        view_.block<1, 3>(1, 0) = u.transpose();
+        view_.block<1, 3>(2, 0) = -f.transpose();
+        view_(0, 3) = -s.dot(eye);
+        view_(1, 3) = -u.dot(eye);
+        view_(2, 3) =  f.dot(eye);
+        viewDirty_ = false;
+    }
+    return view_;
 }
 
 void Camera::applyViewMatrix() const {
-    Vec3f eye = eyePosition();
-    glLoadIdentity();
-    gluLookAt(eye.x(), eye.y(), eye.z(),
-              0.0, 0.0, 0.0,
-              0.0, 0.0, 1.0);
+    glLoadMatrixf(viewMatrix().data());
 }
 
 } // namespace prs
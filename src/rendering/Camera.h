@@ -18,12 +18,15 @@ public:
     float pitch()    const { return pitch_; }
     float distance() const { return distance_; }
 
-    void  setDistance(float d) { distance_ = d; }
+    void  setDistance(float d) { distance_ = d; viewDirty_ = true; }
     float minDistance() const { return minDist_; }
     float maxDistance() const { return maxDist_; }
 
     Vec3f eyePosition() const;
 
+    // Look-at matrix (eye -> origin, +Z up), recomputed only after the
+    // camera moves.
+    const Mat4f& viewMatrix() const;
     void applyViewMatrix() const;
 
 private:
@@ -32,6 +35,9 @@ private:
     float distance_ = 5.0f;
     float minDist_  = 0.5f;
     float maxDist_  = 50.0f;
+
+    mutable Mat4f view_ = Mat4f::Identity();
+    mutable bool viewDirty_ = true;
 };
 
 } // namespace prs
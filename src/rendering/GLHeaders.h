@@ -11,3 +11,11 @@
 #  include <GL/gl.h>
 #  include <GL/glu.h>
 #endif
+
+// GL 1.2 pixel formats; the Windows SDK header stops at 1.1
+#ifndef GL_BGRA
+#  define GL_BGRA 0x80E1
+#endif
+#ifndef GL_UNSIGNED_INT_8_8_8_8_REV
+#  define GL_UNSIGNED_INT_8_8_8_8_REV 0x8367
+#endif
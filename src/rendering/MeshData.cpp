@@ -4,13 +4,19 @@
 #include <QFileInfo>
 #include <QDataStream>
 #include <QTextStream>
+#include <algorithm>
 #include <cstdint>
 #include <limits>
-#include <map>
+#include <numeric>
 #include <sstream>
+#include <tuple>
 
 namespace prs {
 
+static bool vertexLess(const Vec3f& a, const Vec3f& b) {
+    return std::make_tuple(a.x(), a.y(), a.z()) < std::make_tuple(b.x(), b.y(), b.z());
+}
+
 bool MeshData::load(const QString& filepath) {
     QString ext = QFileInfo(filepath).suffix().toLower();
     if (ext == "obj")
@@ -57,6 +63,7 @@ bool MeshData::loadSTL(const QString& filepath) {
     }
 
     filePath_ = filepath;
+    buildTopology();
     computeBounds();
     return true;
 }
@@ -126,6 +133,7 @@ bool MeshData::loadOBJ(const QString& filepath) {
         return false;
 
     filePath_ = filepath;
+    buildTopology();
     computeBounds();
     return true;
 }
@@ -145,32 +153,63 @@ void MeshData::computeBounds() {
                  std::numeric_limits<float>::lowest(),
                  std::numeric_limits<float>::lowest());
 
-    for (auto& tri : triangles_) {
-        for (const Vec3f* v : {&tri.v0, &tri.v1, &tri.v2}) {
-            min_ = min_.cwiseMin(*v);
-            max_ = max_.cwiseMax(*v);
-        }
+    // Welded vertices hold every corner position exactly once
+    for (const Vec3f& v : vertices_) {
+        min_ = min_.cwiseMin(v);
+        max_ = max_.cwiseMax(v);
     }
 
     center_ = (min_ + max_) * 0.5f;
     size_   = (max_ - min_).norm();
 }
 
-int MeshData::boundaryEdgeCount() const {
-    if (triangles_.empty()) return 0;
+void MeshData::buildTopology() {
+    const int n = static_cast<int>(triangles_.size());
+    auto corner = [this](int c) -> const Vec3f& {
+        const Triangle& tri = triangles_[c / 3];
+        return c % 3 == 0 ? tri.v0 : (c % 3 == 1 ? tri.v1 : tri.v2);
+    };
+
+    std::vector<int> order(3 * static_cast<size_t>(n));
+    std::iota(order.begin(), order.end(), 0);
+    std::sort(order.begin(), order.end(),
+              [&](int a, int b) { return vertexLess(corner(a), corner(b)); });
+
+    vertices_.clear();
+    triIndices_.assign(n, {0, 0, 0});
+    for (int c : order) {
+        if (vertices_.empty() || vertexLess(vertices_.back(), corner(c)))
+            vertices_.push_back(corner(c));
+        triIndices_[c / 3][c % 3] = static_cast<int>(vertices_.size()) - 1;
+    }
 
-    std::map<Edge, int> edgeFaceCount;
-    for (const auto& tri : triangles_) {
-        const Vec3f* verts[3] = {&tri.v0, &tri.v1, &tri.v2};
-        for (int j = 0; j < 3; ++j) {
-            Edge e = makeEdge(*verts[j], *verts[(j + 1) % 3]);
-            edgeFaceCount[e]++;
-        }
+    edgeUses_.clear();
+    edgeUses_.reserve(3 * static_cast<size_t>(n));
+    for (int i = 0; i < n; ++i) {
+        const auto& idx = triIndices_[i];
+        for (int j = 0; j < 3; ++j)
+            edgeUses_.push_back({edgeKey(idx[j], idx[(j + 1) % 3]), i});
     }
+    std::sort(edgeUses_.begin(), edgeUses_.end(), [](const EdgeUse& a, const EdgeUse& b) {
+        return a.key < b.key || (a.key == b.key && a.triangle < b.triangle);
+    });
+}
+
+int MeshData::vertexIndex(const Vec3f& v) const {
+    auto it = std::lower_bound(vertices_.begin(), vertices_.end(), v, vertexLess);
+    if (it == vertices_.end() || vertexLess(v, *it)) return -1;
+    return static_cast<int>(it - vertices_.begin());
+}
+
+int MeshData::boundaryEdgeCount() const {
+    if (triangles_.empty()) return 0;
 
     int boundary = 0;
-    for (const auto& [edge, count] : edgeFaceCount) {
-        if (count != 2) ++boundary;
+    for (size_t i = 0; i < edgeUses_.size();) {
+        size_t j = i + 1;
+        while (j < edgeUses_.size() && edgeUses_[j].key == edgeUses_[i].key) ++j;
+        if (j - i != 2) ++boundary;
+        i = j;
     }
     return boundary;
 }
@@ -191,8 +230,13 @@ std::vector<Vec3f> MeshData::flatVertices() const {
 }
 
 std::vector<Vec3f> MeshData::scaledFlatVertices(float scaleFactor) const {
-    auto verts = flatVertices();
-    for (auto& v : verts) v *= scaleFactor;
+    std::vector<Vec3f> verts;
+    verts.reserve(triangles_.size() * 3);
+    for (auto& tri : triangles_) {
+        verts.push_back(tri.v0 * scaleFactor);
+        verts.push_back(tri.v1 * scaleFactor);
+        verts.push_back(tri.v2 * scaleFactor);
+    }
     return verts;
 }
 
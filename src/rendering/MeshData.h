@@ -2,6 +2,9 @@
 
 #include "core/Types.h"
 #include <QString>
+#include <array>
+#include <cstdint>
+#include <utility>
 #include <vector>
 
 namespace prs {
@@ -30,8 +33,28 @@ public:
     std::vector<Vec3f> flatVertices() const;
     std::vector<Vec3f> scaledFlatVertices(float scaleFactor) const;
 
+    // Welded topology: bit-identical positions share one vertex index and
+    // every edge is a single integer key (min index << 32 | max index).
+    struct EdgeUse {
+        uint64_t key;
+        int triangle;
+    };
+    const std::vector<Vec3f>& uniqueVertices() const { return vertices_; }
+    const std::vector<std::array<int, 3>>& triangleIndices() const { return triIndices_; }
+    // Sorted by key, so all triangles sharing an edge are adjacent.
+    const std::vector<EdgeUse>& edgeUses() const { return edgeUses_; }
+    int vertexIndex(const Vec3f& v) const;
+
+    static uint64_t edgeKey(int a, int b) {
+        if (a > b) std::swap(a, b);
+        return (static_cast<uint64_t>(a) << 32) | static_cast<uint32_t>(b);
+    }
+    static int edgeKeyFirst(uint64_t key) { return static_cast<int>(key >> 32); }
+    static int edgeKeySecond(uint64_t key) { return static_cast<int>(key & 0xffffffffu); }
+
 private:
     void computeBounds();
+    void buildTopology();
 
     std::vector<Triangle> triangles_;
     Vec3f center_ = Vec3f::Zero();
@@ -39,6 +62,10 @@ private:
     Vec3f max_    = Vec3f::Zero();
     float size_   = 0.0f;
     QString filePath_;
+
+    std::vector<Vec3f> vertices_;
+    std::vector<std::array<int, 3>> triIndices_;
+    std::vector<EdgeUse> edgeUses_;
 };
 
 } // namespace prs
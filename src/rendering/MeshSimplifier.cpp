@@ -256,14 +256,13 @@ std::vector<Wall> MeshSimplifier::simplify(const std::vector<Wall>& walls,
         w.triangle.v0 = verts[a].pos;
         w.triangle.v1 = verts[b].pos;
         w.triangle.v2 = verts[c].pos;
-        Vec3f e1 = w.triangle.v1 - w.triangle.v0;
-        Vec3f e2 = w.triangle.v2 - w.triangle.v0;
-        w.triangle.normal = e1.cross(e2).normalized();
+        Vec3f n = (w.triangle.v1 - w.triangle.v0).cross(w.triangle.v2 - w.triangle.v0);
+        float doubleArea = n.norm();
+        if (!(0.5f * doubleArea > 1e-8f)) continue;
+        w.triangle.normal = n / doubleArea;
         w.absorption = f.absorption;
         w.scattering = f.scattering;
-
-        if (w.area() > 1e-8f)
-            result.push_back(w);
+        result.push_back(w);
     }
 
     return result;
@@ -1,5 +1,6 @@
 #include "RayPicking.h"
 #include <cmath>
+#include <limits>
 
 namespace prs {
 namespace RayPicking {
@@ -7,26 +8,7 @@ namespace RayPicking {
 std::optional<float> rayTriangleIntersect(
     const Vec3f& rayOrigin, const Vec3f& rayDir, const Triangle& tri)
 {
-    constexpr float eps = 1e-8f;
-    Vec3f edge1 = tri.v1 - tri.v0;
-    Vec3f edge2 = tri.v2 - tri.v0;
-    Vec3f h = rayDir.cross(edge2);
-    float a = edge1.dot(h);
-
-    if (a > -eps && a < eps) return std::nullopt;
-
-    float f = 1.0f / a;
-    Vec3f s = rayOrigin - tri.v0;
-    float u = f * s.dot(h);
-    if (u < 0.0f || u > 1.0f) return std::nullopt;
-
-    Vec3f q = s.cross(edge1);
-    float v = f * rayDir.dot(q);
-    if (v < 0.0f || u + v > 1.0f) return std::nullopt;
-
-    float t = f * edge2.dot(q);
-    if (t > eps) return t;
-    return std::nullopt;
+    return rayTriangleIntersect(rayOrigin, rayDir, tri.v0, tri.v1 - tri.v0, tri.v2 - tri.v0);
 }
 
 std::optional<float> raySphereIntersect(
@@ -50,6 +32,33 @@ std::optional<float> raySphereIntersect(
     return std::nullopt;
 }
 
+int closestSphereHit(const Vec3f& rayOrigin, const Vec3f& rayDir,
+                     const std::vector<Vec3f>& centers, float radius)
+{
+    // rayDir is unit length, so the quadratic's a == 1 and with the half
+    // coefficient b = oc.d the roots are t = -b -/+ sqrt(b^2 - c)
+    const float r2 = radius * radius;
+    float minT = std::numeric_limits<float>::max();
+    int hitIdx = -1;
+
+    for (int i = 0; i < static_cast<int>(centers.size()); ++i) {
+        Vec3f oc = rayOrigin - centers[i];
+        float b = oc.dot(rayDir);
+        float c = oc.dot(oc) - r2;
+        float disc = b * b - c;
+        if (disc < 0.0f) continue;
+
+        float sqrtDisc = std::sqrt(disc);
+        float t1 = -b - sqrtDisc;
+        float t = t1 > 0.0f ? t1 : -b + sqrtDisc;
+        if (t > 0.0f && t < minT) {
+            minT = t;
+            hitIdx = i;
+        }
+    }
+    return hitIdx;
+}
+
 bool segmentPassesThroughSphere(const Vec3f& a, const Vec3f& b,
                                 const Vec3f& center, float radius)
 {
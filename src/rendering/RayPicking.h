@@ -2,6 +2,7 @@
 
 #include "core/Types.h"
 #include <optional>
+#include <vector>
 
 namespace prs {
 
@@ -10,10 +11,42 @@ namespace RayPicking {
 std::optional<float> rayTriangleIntersect(
     const Vec3f& rayOrigin, const Vec3f& rayDir, const Triangle& tri);
 
+/** Möller–Trumbore on precomputed edges (edge1 = v1 - v0, edge2 = v2 - v0).
+ *  Defined inline so BVH leaf loops compile it into their traversal. */
+inline std::optional<float> rayTriangleIntersect(
+    const Vec3f& rayOrigin, const Vec3f& rayDir,
+    const Vec3f& v0, const Vec3f& edge1, const Vec3f& edge2)
+{
+    constexpr float eps = 1e-8f;
+    Vec3f h = rayDir.cross(edge2);
+    float a = edge1.dot(h);
+
+    if (a > -eps && a < eps) return std::nullopt;
+
+    float f = 1.0f / a;
+    Vec3f s = rayOrigin - v0;
+    float u = f * s.dot(h);
+    if (u < 0.0f || u > 1.0f) return std::nullopt;
+
+    Vec3f q = s.cross(edge1);
+    float v = f * rayDir.dot(q);
+    if (v < 0.0f || u + v > 1.0f) return std::nullopt;
+
+    float t = f * edge2.dot(q);
+    if (t > eps) return t;
+    return std::nullopt;
+}
+
 std::optional<float> raySphereIntersect(
     const Vec3f& rayOrigin, const Vec3f& rayDir,
     const Vec3f& center, float radius);
 
+/** Index of the nearest of several equal-radius spheres hit by the ray, or -1.
+ *  rayDir must be unit length. Centers are tested in one pass over the
+ *  contiguous array. */
+int closestSphereHit(const Vec3f& rayOrigin, const Vec3f& rayDir,
+                     const std::vector<Vec3f>& centers, float radius);
+
 /** Returns true if segment [a,b] intersects the sphere (center, radius) at any point strictly between a and b. */
 bool segmentPassesThroughSphere(const Vec3f& a, const Vec3f& b,
                                 const Vec3f& center, float radius);
@@ -1,5 +1,6 @@
+#include <algorithm>
 #include <cmath>
-#include <queue>
+#include <numeric>
 
 #include "SurfaceGrouper.h"
 
@@ -9,78 +10,80 @@ SurfaceGrouper::EdgeSet SurfaceGrouper::computeFeatureEdges(
     const MeshData& mesh, float angleThresholdDeg)
 {
     const auto& tris = mesh.triangles();
-    std::map<Edge, std::vector<int>> edgeToTris;
-
-    for (int i = 0; i < static_cast<int>(tris.size()); ++i) {
-        const Vec3f* verts[3] = {&tris[i].v0, &tris[i].v1, &tris[i].v2};
-        for (int j = 0; j < 3; ++j) {
-            Edge e = makeEdge(*verts[j], *verts[(j + 1) % 3]);
-            edgeToTris[e].push_back(i);
-        }
-    }
+    const auto& uses = mesh.edgeUses();
 
     EdgeSet featureEdges;
-    float thresholdRad = angleThresholdDeg * static_cast<float>(M_PI) / 180.0f;
 
-    for (auto& [edge, triIndices] : edgeToTris) {
-        if (triIndices.size() == 1) {
-            featureEdges.insert(edge);
-        } else if (triIndices.size() == 2) {
-            Vec3f n1 = tris[triIndices[0]].normal.normalized();
-            Vec3f n2 = tris[triIndices[1]].normal.normalized();
-            float dotVal = std::clamp(n1.dot(n2), -1.0f, 1.0f);
-            float angle = std::acos(dotVal);
-            if (angle > thresholdRad) {
-                featureEdges.insert(edge);
-            }
+    std::vector<Vec3f> unitNormals(tris.size());
+    for (size_t t = 0; t < tris.size(); ++t)
+        unitNormals[t] = tris[t].normal.normalized();
+
+    // angle > threshold  <=>  cos(angle) < cos(threshold), so no acos per edge
+    const float cosThreshold = std::cos(angleThresholdDeg * static_cast<float>(M_PI) / 180.0f);
+
+    // Boundary edges (one use) are always features; interior edges (two
+    // uses) are features when their dihedral angle exceeds the threshold
+    for (size_t i = 0; i < uses.size();) {
+        size_t j = i + 1;
+        while (j < uses.size() && uses[j].key == uses[i].key) ++j;
+
+        if (j - i == 1) {
+            featureEdges.insert(uses[i].key);
+        } else if (j - i == 2) {
+            float dotVal = std::clamp(unitNormals[uses[i].triangle].dot(unitNormals[uses[i + 1].triangle]),
+                                      -1.0f, 1.0f);
+            if (dotVal < cosThreshold)
+                featureEdges.insert(uses[i].key);
         }
+        i = j;
     }
 
     return featureEdges;
 }
 
-std::vector<std::set<int>> SurfaceGrouper::groupTrianglesIntoSurfaces(
+std::vector<std::vector<int>> SurfaceGrouper::groupTrianglesIntoSurfaces(
     const MeshData& mesh, const EdgeSet& featureEdges)
 {
-    const auto& tris = mesh.triangles();
-    int n = static_cast<int>(tris.size());
+    const auto& uses = mesh.edgeUses();
+    int n = mesh.triangleCount();
 
-    std::map<Edge, std::vector<int>> edgeToTris;
-    for (int i = 0; i < n; ++i) {
-        const Vec3f* verts[3] = {&tris[i].v0, &tris[i].v1, &tris[i].v2};
-        for (int j = 0; j < 3; ++j) {
-            Edge e = makeEdge(*verts[j], *verts[(j + 1) % 3]);
-            edgeToTris[e].push_back(i);
+    // Union-find over triangles joined by non-feature edges
+    std::vector<int> parent(n);
+    std::iota(parent.begin(), parent.end(), 0);
+    auto find = [&parent](int x) {
+        while (parent[x] != x) {
+            parent[x] = parent[parent[x]];
+            x = parent[x];
         }
-    }
-
-    std::vector<bool> visited(n, false);
-    std::vector<std::set<int>> surfaces;
-
-    for (int i = 0; i < n; ++i) {
-        if (visited[i]) continue;
-
-        std::set<int> surface;
-        std::queue<int> queue;
-        queue.push(i);
+        return x;
+    };
 
-        while (!queue.empty()) {
-            int t = queue.front();
-            queue.pop();
-            if (visited[t]) continue;
-            visited[t] = true;
-            surface.insert(t);
+    for (size_t i = 0; i < uses.size();) {
+        size_t j = i + 1;
+        while (j < uses.size() && uses[j].key == uses[i].key) ++j;
 
-            const Vec3f* verts[3] = {&tris[t].v0, &tris[t].v1, &tris[t].v2};
-            for (int j = 0; j < 3; ++j) {
-                Edge e = makeEdge(*verts[j], *verts[(j + 1) % 3]);
-                if (featureEdges.count(e)) continue;
-                for (int neighbor : edgeToTris[e]) {
-                    if (!visited[neighbor]) queue.push(neighbor);
-                }
+        if (j - i > 1 && !featureEdges.count(uses[i].key)) {
+            int root = find(uses[i].triangle);
+            for (size_t k = i + 1; k < j; ++k) {
+                int other = find(uses[k].triangle);
+                if (other == root) continue;
+                if (other < root) std::swap(root, other);
+                parent[other] = root;
             }
         }
-        surfaces.push_back(std::move(surface));
+        i = j;
+    }
+
+    // Number components in order of their lowest triangle index
+    std::vector<int> label(n, -1);
+    std::vector<std::vector<int>> surfaces;
+    for (int t = 0; t < n; ++t) {
+        int root = find(t);
+        if (label[root] < 0) {
+            label[root] = static_cast<int>(surfaces.size());
+            surfaces.emplace_back();
+        }
+        surfaces[label[root]].push_back(t);
     }
     return surfaces;
 }
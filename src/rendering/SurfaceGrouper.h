@@ -3,19 +3,21 @@
 #include "core/Types.h"
 #include "MeshData.h"
 
+#include <cstdint>
+#include <unordered_set>
 #include <vector>
-#include <set>
-#include <map>
 
 namespace prs {
 
 class SurfaceGrouper {
 public:
-    using EdgeSet = std::set<Edge>;
+    // Feature edges as MeshData::edgeKey() values over unique vertex indices
+    using EdgeSet = std::unordered_set<uint64_t>;
 
     static EdgeSet computeFeatureEdges(const MeshData& mesh, float angleThresholdDeg = 10.0f);
 
-    static std::vector<std::set<int>> groupTrianglesIntoSurfaces(
+    // Each surface lists its triangle indices in ascending order.
+    static std::vector<std::vector<int>> groupTrianglesIntoSurfaces(
         const MeshData& mesh, const EdgeSet& featureEdges);
 };
 
@@ -1,5 +1,4 @@
 #include "TextureManager.h"
-#include <QImage>
 
 namespace prs {
 
@@ -17,20 +16,30 @@ GLuint TextureManager::getOrLoad(const QString& path) {
     QImage img(path);
     if (img.isNull()) return 0;
 
-    QImage glImg = img.convertToFormat(QImage::Format_RGBA8888).flipped(Qt::Vertical);
+    GLuint texId = upload(img);
+    cache_[path] = texId;
+    return texId;
+}
+
+GLuint TextureManager::upload(const QImage& image) {
+    // QImage's native 32-bit layouts are 0xAARRGGBB words, which GL reads
+    // directly as BGRA / 8_8_8_8_REV; decoders usually hand us one of them
+    // already, so no per-pixel swizzle is needed on either side.
+    QImage glImg = (image.format() == QImage::Format_ARGB32 || image.format() == QImage::Format_RGB32)
+                   ? image.flipped(Qt::Vertical)
+                   : image.convertToFormat(QImage::Format_ARGB32).flipped(Qt::Vertical);
 
     GLuint texId = 0;
     glGenTextures(1, &texId);
     glBindTexture(GL_TEXTURE_2D, texId);
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA,
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8,
                  glImg.width(), glImg.height(), 0,
-                 GL_RGBA, GL_UNSIGNED_BYTE, glImg.constBits());
+                 GL_BGRA, GL_UNSIGNED_INT_8_8_8_8_REV, glImg.constBits());
     glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR);
     glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR);
     glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT);
     glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT);
-
-    cache_[path] = texId;
+    glBindTexture(GL_TEXTURE_2D, 0);
     return texId;
 }
 
@@ -1,6 +1,7 @@
 #pragma once
 
 #include "GLHeaders.h"
+#include <QImage>
 #include <QString>
 #include <map>
 
@@ -19,6 +20,9 @@ public:
     void releaseAll();
     bool has(const QString& path) const;
 
+    // Uploads an image to a new GL_TEXTURE_2D (requires a current context).
+    static GLuint upload(const QImage& image);
+
 private:
     std::map<QString, GLuint> cache_;
 };
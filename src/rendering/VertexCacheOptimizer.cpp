@@ -0,0 +1,159 @@
+#include "VertexCacheOptimizer.h"
+
+#include <algorithm>
+#include <cmath>
+#include <deque>
+
+namespace prs {
+
+namespace {
+
+constexpr int   CACHE_SIZE          = 32;
+constexpr float CACHE_DECAY_POWER   = 1.5f;
+constexpr float LAST_TRI_SCORE      = 0.75f;
+constexpr float VALENCE_BOOST_SCALE = 2.0f;
+constexpr float VALENCE_BOOST_POWER = 0.5f;
+
+float vertexScore(int cachePos, int remainingTris) {
+    if (remainingTris == 0) return -1.0f;
+
+    float score = 0.0f;
+    if (cachePos >= 0) {
+        if (cachePos < 3) {
+            score = LAST_TRI_SCORE;
+        } else {
+            float s = 1.0f - static_cast<float>(cachePos - 3) / (CACHE_SIZE - 3);
+            score = std::pow(s, CACHE_DECAY_POWER);
+        }
+    }
+    score += VALENCE_BOOST_SCALE * std::pow(static_cast<float>(remainingTris), -VALENCE_BOOST_POWER);
+    return score;
+}
+
+} // namespace
+
+void VertexCacheOptimizer::optimize(std::vector<uint32_t>& indices, int vertexCount) {
+    const int triCount = static_cast<int>(indices.size() / 3);
+    if (triCount < 2 || vertexCount <= 0) return;
+
+    // Vertex -> triangle adjacency (CSR)
+    std::vector<int> adjOffset(vertexCount + 1, 0);
+    for (uint32_t v : indices) ++adjOffset[v + 1];
+    for (int v = 0; v < vertexCount; ++v) adjOffset[v + 1] += adjOffset[v];
+    std::vector<int> adjTris(indices.size());
+    {
+        std::vector<int> fill(adjOffset.begin(), adjOffset.end() - 1);
+        for (int t = 0; t < triCount; ++t)
+            for (int k = 0; k < 3; ++k)
+                adjTris[fill[indices[3 * t + k]]++] = t;
+    }
+
+    std::vector<int> remaining(vertexCount);
+    for (int v = 0; v < vertexCount; ++v) remaining[v] = adjOffset[v + 1] - adjOffset[v];
+
+    std::vector<int> cachePos(vertexCount, -1);
+    std::vector<float> vScore(vertexCount);
+    for (int v = 0; v < vertexCount; ++v) vScore[v] = vertexScore(-1, remaining[v]);
+
+    std::vector<float> tScore(triCount);
+    for (int t = 0; t < triCount; ++t)
+        tScore[t] = vScore[indices[3 * t]] + vScore[indices[3 * t + 1]] + vScore[indices[3 * t + 2]];
+
+    std::vector<bool> emitted(triCount, false);
+    std::vector<uint32_t> output;
+    output.reserve(indices.size());
+
+    std::vector<int> cache;
+    cache.reserve(CACHE_SIZE + 3);
+    std::vector<int> newCache;
+    newCache.reserve(CACHE_SIZE + 3);
+
+    int bestTri = static_cast<int>(std::max_element(tScore.begin(), tScore.end()) - tScore.begin());
+    int scanCursor = 0;
+
+    for (int emittedCount = 0; emittedCount < triCount; ++emittedCount) {
+        if (bestTri < 0) {
+            // Cache ran dry: continue with the next untouched triangle
+            while (emitted[scanCursor]) ++scanCursor;
+            bestTri = scanCursor;
+        }
+
+        emitted[bestTri] = true;
+        const uint32_t* tri = &indices[3 * bestTri];
+        output.insert(output.end(), tri, tri + 3);
+
+        // Detach the triangle from its vertices' adjacency lists
+        for (int k = 0; k < 3; ++k) {
+            int v = static_cast<int>(tri[k]);
+            int* begin = &adjTris[adjOffset[v]];
+            int* end = begin + remaining[v];
+            std::iter_swap(std::find(begin, end, bestTri), end - 1);
+            --remaining[v];
+        }
+
+        // New LRU cache: the triangle's vertices on top, then the old order
+        newCache.assign(tri, tri + 3);
+        for (int v : cache)
+            if (v != static_cast<int>(tri[0]) && v != static_cast<int>(tri[1]) && v != static_cast<int>(tri[2]))
+                newCache.push_back(v);
+        for (size_t i = CACHE_SIZE; i < newCache.size(); ++i) {
+            int v = newCache[i];
+            cachePos[v] = -1;
+            vScore[v] = vertexScore(-1, remaining[v]);
+            for (int a = adjOffset[v]; a < adjOffset[v] + remaining[v]; ++a) {
+                int t = adjTris[a];
+                tScore[t] = vScore[indices[3 * t]] + vScore[indices[3 * t + 1]] + vScore[indices[3 * t + 2]];
+            }
+        }
+        if (newCache.size() > static_cast<size_t>(CACHE_SIZE))
+            newCache.resize(CACHE_SIZE);
+        cache.swap(newCache);
+
+        for (int i = 0; i < static_cast<int>(cache.size()); ++i) {
+            cachePos[cache[i]] = i;
+            vScore[cache[i]] = vertexScore(i, remaining[cache[i]]);
+        }
+
+        // Rescore triangles touching the cache and pick the best of them
+        bestTri = -1;
+        float bestScore = -1.0f;
+        for (int v : cache) {
+            for (int a = adjOffset[v]; a < adjOffset[v] + remaining[v]; ++a) {
+                int t = adjTris[a];
+                tScore[t] = vScore[indices[3 * t]] + vScore[indices[3 * t + 1]] + vScore[indices[3 * t + 2]];
+                if (tScore[t] > bestScore) {
+                    bestScore = tScore[t];
+                    bestTri = t;
+                }
+            }
+        }
+    }
+
+    indices.swap(output);
+}
+
+std::vector<int> VertexCacheOptimizer::reorderVertices(std::vector<uint32_t>& indices, int vertexCount) {
+    std::vector<int> remap(vertexCount, -1);
+    int next = 0;
+    for (uint32_t& idx : indices) {
+        if (remap[idx] < 0) remap[idx] = next++;
+        idx = static_cast<uint32_t>(remap[idx]);
+    }
+    return remap;
+}
+
+float VertexCacheOptimizer::acmr(const std::vector<uint32_t>& indices, int cacheSize) {
+    if (indices.size() < 3) return 0.0f;
+
+    std::deque<uint32_t> fifo;
+    int misses = 0;
+    for (uint32_t v : indices) {
+        if (std::find(fifo.begin(), fifo.end(), v) != fifo.end()) continue;
+        ++misses;
+        fifo.push_back(v);
+        if (static_cast<int>(fifo.size()) > cacheSize) fifo.pop_front();
+    }
+    return static_cast<float>(misses) / static_cast<float>(indices.size() / 3);
+}
+
+} // namespace prs
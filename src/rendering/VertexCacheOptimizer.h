@@ -0,0 +1,23 @@
+#pragma once
+
+#include <cstdint>
+#include <vector>
+
+namespace prs {
+
+class VertexCacheOptimizer {
+public:
+    // Reorder the triangles of an indexed triangle list for post-transform
+    // vertex cache locality (Forsyth's linear-speed heuristic). The set of
+    // triangles and their winding are preserved.
+    static void optimize(std::vector<uint32_t>& indices, int vertexCount);
+
+    // Renumber vertices in order of first use so vertex fetches stream
+    // forward. remap[old] = new; vertices never referenced map to -1.
+    static std::vector<int> reorderVertices(std::vector<uint32_t>& indices, int vertexCount);
+
+    // Average cache misses per triangle for a FIFO cache of the given size.
+    static float acmr(const std::vector<uint32_t>& indices, int cacheSize = 16);
+};
+
+} // namespace prs
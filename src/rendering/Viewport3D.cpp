@@ -1,9 +1,13 @@
 #include <cmath>
 #include <algorithm>
+#include <array>
+#include <unordered_map>
 
 #include "Viewport3D.h"
 #include "RayPicking.h"
+#include "VertexCacheOptimizer.h"
 #include "GLHeaders.h"
+#include "acoustics/Bvh.h"
 
 #include <QPainter>
 #include <QSettings>
@@ -23,6 +27,7 @@ const std::vector<Color3f>& Viewport3D::pointColors() { return kPointColors; }
 
 Viewport3D::Viewport3D(QWidget* parent)
     : QOpenGLWidget(parent)
+    , pickBvh_(std::make_unique<Bvh>())
 {
     setFocusPolicy(Qt::StrongFocus);
     setMinimumSize(200, 200);
@@ -30,6 +35,22 @@ Viewport3D::Viewport3D(QWidget* parent)
     applyDisplaySettings();
 }
 
+Viewport3D::~Viewport3D() {
+    // GL objects only exist once the context has been created, and must be
+    // freed while it is current
+    if (!isValid()) return;
+    makeCurrent();
+    for (GLuint* buffer : {&modelVertexBuffer_, &modelTexCoordBuffer_, &modelColorBuffer_,
+                           &modelIndexBuffer_, &featureEdgeBuffer_}) {
+        if (*buffer != 0) glDeleteBuffers(1, buffer);
+        *buffer = 0;
+    }
+    if (textureId_ != 0) glDeleteTextures(1, &textureId_);
+    textureId_ = 0;
+    textureManager_.releaseAll();
+    doneCurrent();
+}
+
 void Viewport3D::applyDisplaySettings() {
     QSettings s("PyRoomStudio", "PyRoomStudio");
     gridVisible_       = s.value("display/gridVisible", true).toBool();
@@ -37,6 +58,7 @@ void Viewport3D::applyDisplaySettings() {
     transparencyAlpha_ = static_cast<float>(s.value("display/transparencyAlpha", 0.55).toDouble());
     markerSize_        = s.value("display/markerSize", 15).toInt();
     texturesEnabled_   = s.value("display/texturesEnabled", true).toBool();
+    gridDirty_ = true;
     for (int i = 0; i < static_cast<int>(surfaceColors_.size()); ++i)
         emit surfaceAppearanceChanged(i);
     update();
@@ -46,7 +68,9 @@ bool Viewport3D::loadModel(const QString& filepath) {
     if (!mesh_.load(filepath)) return false;
 
     modelCenter_  = mesh_.center();
+    updateModelMatrix();
     originalSize_ = mesh_.diagonalSize();
+    pickBvh_->build(mesh_.triangles());
 
     featureEdges_ = SurfaceGrouper::computeFeatureEdges(mesh_, 10.0f);
     surfaces_     = SurfaceGrouper::groupTrianglesIntoSurfaces(mesh_, featureEdges_);
@@ -56,10 +80,14 @@ bool Viewport3D::loadModel(const QString& filepath) {
     surfaceTextured_.assign(surfaces_.size(), false);
     surfaceTextureIds_.assign(surfaces_.size(), 0);
 
-    triangleToSurface_.clear();
+    triangleToSurface_.assign(mesh_.triangleCount(), -1);
     for (int si = 0; si < static_cast<int>(surfaces_.size()); ++si)
         for (int ti : surfaces_[si])
             triangleToSurface_[ti] = si;
+    buildSurfaceOutlines();
+    modelBuffersDirty_ = true;
+    modelColorsDirty_ = true;
+    gridDirty_ = true;
 
     placedPoints_.clear();
     activePointIndex_ = -1;
@@ -92,11 +120,20 @@ void Viewport3D::autoNormalizeScale() {
     else
         factor = TARGET_SIZE / orig;
 
-    setScaleFactor(factor);
+    applyScaleFactor(factor);
 }
 
 void Viewport3D::setScaleFactor(float factor) {
+    // Re-applying the current scale would only reset the camera and reload
+    // the projection; model loads go through applyScaleFactor() directly
+    if (factor == scaleFactor_) return;
+    applyScaleFactor(factor);
+}
+
+void Viewport3D::applyScaleFactor(float factor) {
     scaleFactor_ = factor;
+    updateModelMatrix();
+    gridDirty_ = true;
     float scaledSize = mesh_.diagonalSize() * factor;
     camera_.setDistance(2.5f * scaledSize);
     camera_.setDistanceLimits(0.2f * scaledSize, 5.0f * scaledSize);
@@ -107,16 +144,40 @@ void Viewport3D::setScaleFactor(float factor) {
 
 void Viewport3D::updateProjection() {
     makeCurrent();
-    float nearPlane = 0.1f;
-    float farPlane  = std::max(100.0f, camera_.maxDistance() * 10.0f);
-    glMatrixMode(GL_PROJECTION);
-    glLoadIdentity();
     float aspect = width() > 0 ? static_cast<float>(width()) / height() : 1.0f;
-    gluPerspective(45.0, aspect, nearPlane, farPlane);
+    computeProjection(aspect);
+    glMatrixMode(GL_PROJECTION);
+    glLoadMatrixf(projection_.data());
     glMatrixMode(GL_MODELVIEW);
     doneCurrent();
 }
 
+void Viewport3D::computeProjection(float aspect) {
+    // Same matrix as gluPerspective(45, aspect, near, far)
+    float nearPlane = 0.1f;
+    float farPlane  = std::max(100.0f, camera_.maxDistance() * 10.0f);
+    float f = 1.0f / std::tan(45.0f * static_cast<float>(M_PI) / 360.0f);
+
+    projection_.setZero();
+    projection_(0, 0) = f / aspect;
+    projection_(1, 1) = f;
+    projection_(2, 2) = (farPlane + nearPlane) / (nearPlane - farPlane);
+    projection_(2, 3) = 2.0f * farPlane * nearPlane / (nearPlane - farPlane);
+    projection_(3, 2) = -1.0f;
+}
+
+void Viewport3D::updateModelMatrix() {
+    // scale(scaleFactor) * translate(-modelCenter)
+    modelMatrix_.setIdentity();
+    modelMatrix_.topLeftCorner<3, 3>() *= scaleFactor_;
+    modelMatrix_.block<3, 1>(0, 3) = -scaleFactor_ * modelCenter_;
+}
+
+void Viewport3D::applyModelViewMatrix() {
+    Mat4f modelView = camera_.viewMatrix() * modelMatrix_;
+    glLoadMatrixf(modelView.data());
+}
+
 Vec3f Viewport3D::getRealWorldDimensions() const {
     return (mesh_.maxBound() - mesh_.minBound()) * scaleFactor_;
 }
@@ -144,8 +205,11 @@ void Viewport3D::notifyPlacedPointsChanged() {
 }
 
 void Viewport3D::updateActivePointDistance(float distance) {
-    if (activePointIndex_ >= 0 && activePointIndex_ < static_cast<int>(placedPoints_.size()))
-        placedPoints_[activePointIndex_].distance = distance;
+    if (activePointIndex_ < 0 || activePointIndex_ >= static_cast<int>(placedPoints_.size()))
+        return;
+    float& current = placedPoints_[activePointIndex_].distance;
+    if (current == distance) return;
+    current = distance;
     update();
 }
 
@@ -304,6 +368,7 @@ void Viewport3D::setSurfaceColor(int surfIdx, const Color3f& color) {
     if (surfIdx >= 0 && surfIdx < static_cast<int>(surfaceColors_.size())) {
         surfaceColors_[surfIdx] = color;
         surfaceTextured_[surfIdx] = false;
+        pendingColorSurfaces_.push_back(surfIdx);
         emit surfaceAppearanceChanged(surfIdx);
         update();
     }
@@ -321,6 +386,7 @@ void Viewport3D::assignMaterial(int surfIdx, const Material& material) {
             srgbByteToLinear(material.color[1]),
             srgbByteToLinear(material.color[2])
         };
+        pendingColorSurfaces_.push_back(surfIdx);
 
         if (!material.texturePath.empty()) {
             makeCurrent();
@@ -372,35 +438,38 @@ bool Viewport3D::loadTexture(const QString& filepath) {
     QImage img(filepath);
     if (img.isNull()) return false;
 
-    textureImage_ = img.convertToFormat(QImage::Format_RGBA8888).flipped(Qt::Vertical);
+    textureImage_ = img;
     makeCurrent();
     if (textureId_ != 0) glDeleteTextures(1, &textureId_);
-    glGenTextures(1, &textureId_);
-    glBindTexture(GL_TEXTURE_2D, textureId_);
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, textureImage_.width(), textureImage_.height(),
-                 0, GL_RGBA, GL_UNSIGNED_BYTE, textureImage_.constBits());
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR);
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR);
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT);
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT);
-    glBindTexture(GL_TEXTURE_2D, 0);
+    textureId_ = TextureManager::upload(textureImage_);
     doneCurrent();
     update();
     return true;
 }
 
+// Planar projection axis used for a face's texture coordinates:
+// 0 = XY plane, 1 = XZ plane, 2 = YZ plane
+static int texProjectionAxis(const Vec3f& normal) {
+    Vec3f absNormal = normal.cwiseAbs();
+    if (absNormal.z() >= absNormal.x() && absNormal.z() >= absNormal.y())
+        return 0;
+    if (absNormal.y() >= absNormal.x())
+        return 1;
+    return 2;
+}
+
 static Vec2f getTexCoordsFromNormal(const Vec3f& vertex, const Vec3f& normal,
                                      const Vec3f& boundsMin, const Vec3f& boundsMax) {
-    Vec3f absNormal = normal.cwiseAbs();
     Vec3f extent = boundsMax - boundsMin;
     float u = 0, v = 0;
 
-    if (absNormal.z() >= absNormal.x() && absNormal.z() >= absNormal.y()) {
+    int axis = texProjectionAxis(normal);
+    if (axis == 0) {
         float ex = extent.x() > 1e-6f ? extent.x() : 1.0f;
         float ey = extent.y() > 1e-6f ? extent.y() : 1.0f;
         u = (vertex.x() - boundsMin.x()) / ex;
         v = (vertex.y() - boundsMin.y()) / ey;
-    } else if (absNormal.y() >= absNormal.x()) {
+    } else if (axis == 1) {
         float ex = extent.x() > 1e-6f ? extent.x() : 1.0f;
         float ez = extent.z() > 1e-6f ? extent.z() : 1.0f;
         u = (vertex.x() - boundsMin.x()) / ex;
@@ -449,9 +518,10 @@ Viewport3D::getSourcesAndListeners(const std::string& audioFile) const {
 
 std::vector<Viewport3D::WallInfo> Viewport3D::getWallsForAcoustic() const {
     std::vector<WallInfo> walls;
+    walls.reserve(surfaces_.size());
     for (int si = 0; si < static_cast<int>(surfaces_.size()); ++si) {
         WallInfo wi;
-        wi.triangleIndices.assign(surfaces_[si].begin(), surfaces_[si].end());
+        wi.triangleIndices = surfaces_[si];
         if (si < static_cast<int>(surfaceMaterials_.size()) && surfaceMaterials_[si].has_value()) {
             wi.absorption = surfaceMaterials_[si]->absorption;
             wi.scattering = surfaceMaterials_[si]->scattering;
@@ -480,12 +550,10 @@ void Viewport3D::initializeGL() {
 
 void Viewport3D::resizeGL(int w, int h) {
     glViewport(0, 0, w, h);
-    glMatrixMode(GL_PROJECTION);
-    glLoadIdentity();
     float aspect = h > 0 ? static_cast<float>(w) / h : 1.0f;
-    float nearPlane = 0.1f;
-    float farPlane  = std::max(100.0f, camera_.maxDistance() * 10.0f);
-    gluPerspective(45.0, aspect, nearPlane, farPlane);
+    computeProjection(aspect);
+    glMatrixMode(GL_PROJECTION);
+    glLoadMatrixf(projection_.data());
     glMatrixMode(GL_MODELVIEW);
 }
 
@@ -510,9 +578,7 @@ void Viewport3D::paintGL() {
     if (measurePoint1_ && measurePoint2_) {
         glEnable(GL_BLEND);
         glPushMatrix();
-        camera_.applyViewMatrix();
-        glScalef(scaleFactor_, scaleFactor_, scaleFactor_);
-        glTranslatef(-modelCenter_.x(), -modelCenter_.y(), -modelCenter_.z());
+        applyModelViewMatrix();
         glDisable(GL_DEPTH_TEST);
         glColor4f(1.0f, 1.0f, 0.0f, 1.0f);
         glLineWidth(3);
@@ -546,15 +612,7 @@ void Viewport3D::drawPlaceholder() {
     painter.end();
 }
 
-void Viewport3D::drawMeasurementGrid() {
-    if (!gridVisible_) return;
-
-    glEnable(GL_BLEND);
-    glPushMatrix();
-    camera_.applyViewMatrix();
-    glScalef(scaleFactor_, scaleFactor_, scaleFactor_);
-    glTranslatef(-modelCenter_.x(), -modelCenter_.y(), -modelCenter_.z());
-
+void Viewport3D::buildGridVertices() {
     Vec3f mn = mesh_.minBound();
     Vec3f mx = mesh_.maxBound();
     float gridZ = mn.z();
@@ -566,50 +624,214 @@ void Viewport3D::drawMeasurementGrid() {
     float minorSpacing = meterInOrigUnits;
     int numLines = static_cast<int>(extent / minorSpacing) + 1;
 
-    glDisable(GL_LIGHTING);
-    glDisable(GL_TEXTURE_2D);
-
+    gridMinorVertices_.clear();
+    gridMajorVertices_.clear();
     for (int i = -numLines; i <= numLines; ++i) {
         float offset = i * minorSpacing;
-        bool isMajor = (i % 5 == 0);
+        auto& verts = (i % 5 == 0) ? gridMajorVertices_ : gridMinorVertices_;
+        verts.insert(verts.end(), {
+            cx - extent, cy + offset, gridZ,  cx + extent, cy + offset, gridZ,
+            cx + offset, cy - extent, gridZ,  cx + offset, cy + extent, gridZ,
+        });
+    }
+    gridDirty_ = false;
+}
 
-        if (isMajor) { glColor4f(0.4f, 0.4f, 0.4f, 0.8f); glLineWidth(2); }
-        else         { glColor4f(0.7f, 0.7f, 0.7f, 0.5f); glLineWidth(1); }
+void Viewport3D::drawMeasurementGrid() {
+    if (!gridVisible_) return;
 
-        glBegin(GL_LINES);
-        glVertex3f(cx - extent, cy + offset, gridZ);
-        glVertex3f(cx + extent, cy + offset, gridZ);
-        glEnd();
+    if (gridDirty_)
+        buildGridVertices();
 
-        glBegin(GL_LINES);
-        glVertex3f(cx + offset, cy - extent, gridZ);
-        glVertex3f(cx + offset, cy + extent, gridZ);
-        glEnd();
-    }
+    glEnable(GL_BLEND);
+    glPushMatrix();
+    applyModelViewMatrix();
 
+    glDisable(GL_LIGHTING);
+    glDisable(GL_TEXTURE_2D);
+    glEnableClientState(GL_VERTEX_ARRAY);
+
+    glColor4f(0.7f, 0.7f, 0.7f, 0.5f);
+    glLineWidth(1);
+    glVertexPointer(3, GL_FLOAT, 0, gridMinorVertices_.data());
+    glDrawArrays(GL_LINES, 0, static_cast<GLsizei>(gridMinorVertices_.size() / 3));
+
+    glColor4f(0.4f, 0.4f, 0.4f, 0.8f);
+    glLineWidth(2);
+    glVertexPointer(3, GL_FLOAT, 0, gridMajorVertices_.data());
+    glDrawArrays(GL_LINES, 0, static_cast<GLsizei>(gridMajorVertices_.size() / 3));
+
+    glDisableClientState(GL_VERTEX_ARRAY);
     glPopMatrix();
     glDisable(GL_BLEND);
 }
 
-void Viewport3D::drawModel() {
-    glPushMatrix();
-    camera_.applyViewMatrix();
-    glScalef(scaleFactor_, scaleFactor_, scaleFactor_);
-    glTranslatef(-modelCenter_.x(), -modelCenter_.y(), -modelCenter_.z());
-
+void Viewport3D::buildModelBuffers() {
     const auto& tris = mesh_.triangles();
+    const auto& triIndices = mesh_.triangleIndices();
+    const auto& welded = mesh_.uniqueVertices();
     Vec3f mn = mesh_.minBound();
     Vec3f mx = mesh_.maxBound();
+    std::vector<float> positions;
+    std::vector<float> texCoords;
+    std::vector<uint32_t> indices;
+    positions.reserve(tris.size() * 3);
+    texCoords.reserve(tris.size() * 2);
+    indices.reserve(tris.size() * 3);
+    surfaceFirstVertex_.assign(1, 0);
+    surfaceFirstIndex_.assign(1, 0);
+
+    // Each surface gets its own vertices (so its color range stays
+    // contiguous), shared between its triangles where position and texture
+    // projection agree, and its triangles reordered for the vertex cache.
+    static const Vec3f kAxisNormals[3] = {Vec3f(0, 0, 1), Vec3f(0, 1, 0), Vec3f(1, 0, 0)};
+    std::unordered_map<uint64_t, uint32_t> localIndex;
+    std::vector<uint64_t> localKeys;
+    std::vector<uint32_t> surfIndices;
+    for (const auto& surface : surfaces_) {
+        localIndex.clear();
+        localKeys.clear();
+        surfIndices.clear();
+        for (int ti : surface) {
+            uint64_t axis = static_cast<uint64_t>(texProjectionAxis(tris[ti].normal));
+            for (int k = 0; k < 3; ++k) {
+                uint64_t key = (static_cast<uint64_t>(triIndices[ti][k]) << 2) | axis;
+                auto [it, inserted] = localIndex.try_emplace(key, static_cast<uint32_t>(localKeys.size()));
+                if (inserted) localKeys.push_back(key);
+                surfIndices.push_back(it->second);
+            }
+        }
+
+        int vertexCount = static_cast<int>(localKeys.size());
+        VertexCacheOptimizer::optimize(surfIndices, vertexCount);
+        std::vector<int> remap = VertexCacheOptimizer::reorderVertices(surfIndices, vertexCount);
+        std::vector<uint64_t> orderedKeys(vertexCount);
+        for (int v = 0; v < vertexCount; ++v)
+            orderedKeys[remap[v]] = localKeys[v];
+
+        uint32_t base = static_cast<uint32_t>(positions.size() / 3);
+        for (uint64_t key : orderedKeys) {
+            const Vec3f& p = welded[key >> 2];
+            positions.insert(positions.end(), {p.x(), p.y(), p.z()});
+            Vec2f uv = getTexCoordsFromNormal(p, kAxisNormals[key & 3], mn, mx);
+            texCoords.insert(texCoords.end(), {uv.x(), uv.y()});
+        }
+        for (uint32_t idx : surfIndices)
+            indices.push_back(base + idx);
+
+        surfaceFirstVertex_.push_back(static_cast<int>(positions.size() / 3));
+        surfaceFirstIndex_.push_back(static_cast<int>(indices.size()));
+    }
+
+    if (modelVertexBuffer_ == 0) glGenBuffers(1, &modelVertexBuffer_);
+    if (modelTexCoordBuffer_ == 0) glGenBuffers(1, &modelTexCoordBuffer_);
+    if (modelColorBuffer_ == 0) glGenBuffers(1, &modelColorBuffer_);
+    if (modelIndexBuffer_ == 0) glGenBuffers(1, &modelIndexBuffer_);
+
+    glBindBuffer(GL_ARRAY_BUFFER, modelVertexBuffer_);
+    glBufferData(GL_ARRAY_BUFFER, positions.size() * sizeof(float), positions.data(), GL_STATIC_DRAW);
+    glBindBuffer(GL_ARRAY_BUFFER, modelTexCoordBuffer_);
+    glBufferData(GL_ARRAY_BUFFER, texCoords.size() * sizeof(float), texCoords.data(), GL_STATIC_DRAW);
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, modelIndexBuffer_);
+    glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.size() * sizeof(uint32_t), indices.data(), GL_STATIC_DRAW);
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0);
+
+    std::vector<float> edgeVertices;
+    edgeVertices.reserve(featureEdges_.size() * 6);
+    const auto& uniqueVerts = mesh_.uniqueVertices();
+    for (uint64_t key : featureEdges_) {
+        const Vec3f& e1 = uniqueVerts[MeshData::edgeKeyFirst(key)];
+        const Vec3f& e2 = uniqueVerts[MeshData::edgeKeySecond(key)];
+        edgeVertices.insert(edgeVertices.end(), {e1.x(), e1.y(), e1.z(), e2.x(), e2.y(), e2.z()});
+    }
+    featureEdgeVertexCount_ = static_cast<int>(edgeVertices.size() / 3);
+
+    if (featureEdgeBuffer_ == 0) glGenBuffers(1, &featureEdgeBuffer_);
+    glBindBuffer(GL_ARRAY_BUFFER, featureEdgeBuffer_);
+    glBufferData(GL_ARRAY_BUFFER, edgeVertices.size() * sizeof(float), edgeVertices.data(), GL_STATIC_DRAW);
+    glBindBuffer(GL_ARRAY_BUFFER, 0);
+
+    modelBuffersDirty_ = false;
+    modelColorsDirty_ = true;
+}
+
+static void fillSurfaceColors(std::vector<float>& colors, int first, int last,
+                              const Color3f& c, float alpha) {
+    for (int v = first; v < last; ++v) {
+        float* dst = &colors[static_cast<size_t>(v) * 4];
+        dst[0] = c[0]; dst[1] = c[1]; dst[2] = c[2]; dst[3] = alpha;
+    }
+}
+
+void Viewport3D::updateModelColors(float alpha) {
+    modelColors_.resize(static_cast<size_t>(surfaceFirstVertex_.back()) * 4);
+    for (int si = 0; si < static_cast<int>(surfaces_.size()); ++si)
+        fillSurfaceColors(modelColors_, surfaceFirstVertex_[si], surfaceFirstVertex_[si + 1],
+                          surfaceColors_[si], alpha);
+
+    glBindBuffer(GL_ARRAY_BUFFER, modelColorBuffer_);
+    glBufferData(GL_ARRAY_BUFFER, modelColors_.size() * sizeof(float), modelColors_.data(), GL_DYNAMIC_DRAW);
+    glBindBuffer(GL_ARRAY_BUFFER, 0);
+
+    modelColorsAlpha_ = alpha;
+    modelColorsDirty_ = false;
+    pendingColorSurfaces_.clear();
+}
+
+void Viewport3D::updateSurfaceColors(int surfIdx) {
+    int first = surfaceFirstVertex_[surfIdx];
+    int last  = surfaceFirstVertex_[surfIdx + 1];
+    if (first == last) return;
+
+    fillSurfaceColors(modelColors_, first, last, surfaceColors_[surfIdx], modelColorsAlpha_);
+
+    glBindBuffer(GL_ARRAY_BUFFER, modelColorBuffer_);
+    glBufferSubData(GL_ARRAY_BUFFER, static_cast<GLintptr>(first) * 4 * sizeof(float),
+                    static_cast<GLsizeiptr>(last - first) * 4 * sizeof(float),
+                    &modelColors_[static_cast<size_t>(first) * 4]);
+    glBindBuffer(GL_ARRAY_BUFFER, 0);
+}
+
+void Viewport3D::drawSurfaceRange(int firstSurface, int lastSurface) {
+    int first = surfaceFirstIndex_[firstSurface];
+    int count = surfaceFirstIndex_[lastSurface] - first;
+    if (count == 0) return;
+    glDrawElements(GL_TRIANGLES, count, GL_UNSIGNED_INT,
+                   reinterpret_cast<const void*>(static_cast<uintptr_t>(first) * sizeof(uint32_t)));
+}
+
+void Viewport3D::drawModel() {
+    glPushMatrix();
+    applyModelViewMatrix();
+
     float alpha = transparentMode_ ? transparencyAlpha_ : 1.0f;
 
+    if (modelBuffersDirty_)
+        buildModelBuffers();
+    if (modelColorsDirty_ || alpha != modelColorsAlpha_) {
+        updateModelColors(alpha);
+    } else if (!pendingColorSurfaces_.empty()) {
+        for (int si : pendingColorSurfaces_)
+            updateSurfaceColors(si);
+        pendingColorSurfaces_.clear();
+    }
+
     if (transparentMode_)
         glEnable(GL_BLEND);
 
+    const int numSurfaces = static_cast<int>(surfaces_.size());
+
+    glBindBuffer(GL_ARRAY_BUFFER, modelVertexBuffer_);
+    glEnableClientState(GL_VERTEX_ARRAY);
+    glVertexPointer(3, GL_FLOAT, 0, nullptr);
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, modelIndexBuffer_);
+
     // Draw textured surfaces (per-surface or global texture)
-    for (int i = 0; i < static_cast<int>(tris.size()); ++i) {
-        auto it = triangleToSurface_.find(i);
-        if (it == triangleToSurface_.end()) continue;
-        int si = it->second;
+    glBindBuffer(GL_ARRAY_BUFFER, modelTexCoordBuffer_);
+    glEnableClientState(GL_TEXTURE_COORD_ARRAY);
+    glTexCoordPointer(2, GL_FLOAT, 0, nullptr);
+    glColor4f(1.0f, 1.0f, 1.0f, alpha);
+    for (int si = 0; si < numSurfaces; ++si) {
         if (!texturesEnabled_ || !surfaceTextured_[si]) continue;
 
         GLuint texId = (si < static_cast<int>(surfaceTextureIds_.size()) && surfaceTextureIds_[si] != 0)
@@ -618,60 +840,72 @@ void Viewport3D::drawModel() {
 
         glEnable(GL_TEXTURE_2D);
         glBindTexture(GL_TEXTURE_2D, texId);
-        glColor4f(1.0f, 1.0f, 1.0f, alpha);
-        glBegin(GL_TRIANGLES);
-        for (const Vec3f* v : {&tris[i].v0, &tris[i].v1, &tris[i].v2}) {
-            Vec2f uv = getTexCoordsFromNormal(*v, tris[i].normal, mn, mx);
-            glTexCoord2f(uv.x(), uv.y());
-            glVertex3f(v->x(), v->y(), v->z());
-        }
-        glEnd();
+        drawSurfaceRange(si, si + 1);
         glDisable(GL_TEXTURE_2D);
         glBindTexture(GL_TEXTURE_2D, 0);
     }
+    glDisableClientState(GL_TEXTURE_COORD_ARRAY);
 
-    // Draw non-textured surfaces (includes textured surfaces when textures disabled)
+    // Draw non-textured surfaces (includes textured surfaces when textures disabled),
+    // merging runs of adjacent surfaces into a single draw call
     glDisable(GL_TEXTURE_2D);
-    for (int i = 0; i < static_cast<int>(tris.size()); ++i) {
-        auto it = triangleToSurface_.find(i);
-        if (it == triangleToSurface_.end()) continue;
-        int si = it->second;
-        if (texturesEnabled_ && surfaceTextured_[si]) continue;
-
-        auto& c = surfaceColors_[si];
-        glColor4f(c[0], c[1], c[2], alpha);
-
-        glBegin(GL_TRIANGLES);
-        glVertex3f(tris[i].v0.x(), tris[i].v0.y(), tris[i].v0.z());
-        glVertex3f(tris[i].v1.x(), tris[i].v1.y(), tris[i].v1.z());
-        glVertex3f(tris[i].v2.x(), tris[i].v2.y(), tris[i].v2.z());
-        glEnd();
+    glBindBuffer(GL_ARRAY_BUFFER, modelColorBuffer_);
+    glEnableClientState(GL_COLOR_ARRAY);
+    glColorPointer(4, GL_FLOAT, 0, nullptr);
+    glBindBuffer(GL_ARRAY_BUFFER, 0);
+
+    int runStart = -1;
+    for (int si = 0; si <= numSurfaces; ++si) {
+        bool plain = si < numSurfaces && !(texturesEnabled_ && surfaceTextured_[si]);
+        if (plain && runStart < 0) {
+            runStart = si;
+        } else if (!plain && runStart >= 0) {
+            drawSurfaceRange(runStart, si);
+            runStart = -1;
+        }
     }
 
+    glDisableClientState(GL_COLOR_ARRAY);
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0);
+
     if (transparentMode_)
         glDisable(GL_BLEND);
 
     // Draw feature edges
     glColor3f(0, 0, 0);
     glLineWidth(3);
-    glBegin(GL_LINES);
-    for (auto& [e1, e2] : featureEdges_) {
-        glVertex3f(std::get<0>(e1), std::get<1>(e1), std::get<2>(e1));
-        glVertex3f(std::get<0>(e2), std::get<1>(e2), std::get<2>(e2));
-    }
-    glEnd();
+    glBindBuffer(GL_ARRAY_BUFFER, featureEdgeBuffer_);
+    glVertexPointer(3, GL_FLOAT, 0, nullptr);
+    glBindBuffer(GL_ARRAY_BUFFER, 0);
+    glDrawArrays(GL_LINES, 0, featureEdgeVertexCount_);
+    glDisableClientState(GL_VERTEX_ARRAY);
 
     glPopMatrix();
 }
 
+static constexpr int kMarkerSegments = 24;
+
+// Unit circle: the center, then kMarkerSegments + 1 rim points (the last
+// repeats the first)
+static const std::array<float, 2 * (kMarkerSegments + 2)>& unitCircleFan() {
+    static const auto fan = [] {
+        std::array<float, 2 * (kMarkerSegments + 2)> v{};
+        for (int s = 0; s <= kMarkerSegments; ++s) {
+            float angle = 2.0f * static_cast<float>(M_PI) * s / kMarkerSegments;
+            v[2 * (s + 1)]     = std::cos(angle);
+            v[2 * (s + 1) + 1] = std::sin(angle);
+        }
+        return v;
+    }();
+    return fan;
+}
+
 void Viewport3D::drawPointMarkers() {
     if (placedPoints_.empty()) return;
 
     glEnable(GL_BLEND);
     glPushMatrix();
-    camera_.applyViewMatrix();
-    glScalef(scaleFactor_, scaleFactor_, scaleFactor_);
-    glTranslatef(-modelCenter_.x(), -modelCenter_.y(), -modelCenter_.z());
+    applyModelViewMatrix();
 
     glDisable(GL_TEXTURE_2D);
     if (transparentMode_) {
@@ -683,8 +917,25 @@ void Viewport3D::drawPointMarkers() {
 
     float baseSize = (markerSize_ / 100.0f) / scaleFactor_;
 
-    GLfloat modelview[16];
-    glGetFloatv(GL_MODELVIEW_MATRIX, modelview);
+    // Camera right/up axes in model space, taken once per frame from the
+    // cached matrices; markers are built facing the camera
+    Mat4f modelView = camera_.viewMatrix() * modelMatrix_;
+    Vec3f right = modelView.block<1, 3>(0, 0).transpose();
+    Vec3f up    = modelView.block<1, 3>(1, 0).transpose();
+    const auto& circle = unitCircleFan();
+
+    // All marker discs go into one triangle batch; outlines into two line
+    // batches (highlighted markers draw wider lines); listener arrows into
+    // a line batch for the shafts and a triangle batch for the heads
+    markerFill_.clear();
+    markerThickLines_.clear();
+    markerThinLines_.clear();
+    listenerArrowLines_.clear();
+    listenerArrowHeads_.clear();
+    auto addVertex = [](MarkerBatch& batch, const Vec3f& p, float r, float g, float b, float a) {
+        batch.vertices.insert(batch.vertices.end(), {p.x(), p.y(), p.z()});
+        batch.colors.insert(batch.colors.end(), {r, g, b, a});
+    };
 
     for (int i = 0; i < static_cast<int>(placedPoints_.size()); ++i) {
         auto& pt = placedPoints_[i];
@@ -700,39 +951,25 @@ void Viewport3D::drawPointMarkers() {
         else if (pt.pointType == POINT_TYPE_LISTENER)
             color = {0.2f, 0.2f, 0.8f};
 
-        // Billboard circle
-        glPushMatrix();
-        glTranslatef(pos.x(), pos.y(), pos.z());
+        Vec3f rim[kMarkerSegments + 1];
+        for (int s = 0; s <= kMarkerSegments; ++s)
+            rim[s] = pos + (right * circle[2 * (s + 1)] + up * circle[2 * (s + 1) + 1]) * size;
 
-        GLfloat billboard[16] = {
-            modelview[0], modelview[4], modelview[8], 0,
-            modelview[1], modelview[5], modelview[9], 0,
-            modelview[2], modelview[6], modelview[10], 0,
-            0, 0, 0, 1
-        };
-        glMultMatrixf(billboard);
-
-        constexpr int segs = 24;
-        glColor4f(color[0], color[1], color[2], alpha);
-        glBegin(GL_TRIANGLE_FAN);
-        glVertex3f(0, 0, 0);
-        for (int s = 0; s <= segs; ++s) {
-            float angle = 2.0f * static_cast<float>(M_PI) * s / segs;
-            glVertex3f(size * std::cos(angle), size * std::sin(angle), 0);
+        for (int s = 0; s < kMarkerSegments; ++s) {
+            addVertex(markerFill_, pos, color[0], color[1], color[2], alpha);
+            addVertex(markerFill_, rim[s], color[0], color[1], color[2], alpha);
+            addVertex(markerFill_, rim[s + 1], color[0], color[1], color[2], alpha);
         }
-        glEnd();
 
-        if (isActive) { glColor4f(1, 1, 1, 1); glLineWidth(3); }
-        else if (isSelected) { glColor4f(1, 1, 0, 1); glLineWidth(3); }
-        else          { glColor4f(color[0]*0.5f, color[1]*0.5f, color[2]*0.5f, alpha); glLineWidth(2); }
-        glBegin(GL_LINE_LOOP);
-        for (int s = 0; s < segs; ++s) {
-            float angle = 2.0f * static_cast<float>(M_PI) * s / segs;
-            glVertex3f(size * std::cos(angle), size * std::sin(angle), 0);
+        Color3f lineColor = {color[0] * 0.5f, color[1] * 0.5f, color[2] * 0.5f};
+        float lineAlpha = alpha;
+        if (isActive) { lineColor = {1, 1, 1}; lineAlpha = 1; }
+        else if (isSelected) { lineColor = {1, 1, 0}; lineAlpha = 1; }
+        MarkerBatch& lines = (isActive || isSelected) ? markerThickLines_ : markerThinLines_;
+        for (int s = 0; s < kMarkerSegments; ++s) {
+            addVertex(lines, rim[s], lineColor[0], lineColor[1], lineColor[2], lineAlpha);
+            addVertex(lines, rim[s + 1], lineColor[0], lineColor[1], lineColor[2], lineAlpha);
         }
-        glEnd();
-
-        glPopMatrix();
 
         // Direction arrow for listener points (always horizontal, parallel to grid floor)
         if (pt.pointType == POINT_TYPE_LISTENER) {
@@ -740,26 +977,38 @@ void Viewport3D::drawPointMarkers() {
             float arrowLen = size * 4.2f;
             Vec3f tip = pos + fwd * arrowLen;
 
-            Vec3f right(-fwd.y(), fwd.x(), 0.0f);
+            Vec3f side(-fwd.y(), fwd.x(), 0.0f);
             float headSize = arrowLen * 0.35f;
-            Vec3f head1 = tip - fwd * headSize + right * headSize * 0.5f;
-            Vec3f head2 = tip - fwd * headSize - right * headSize * 0.5f;
-
-            glColor4f(1.0f, 1.0f, 1.0f, alpha);
-            glLineWidth(4);
-            glBegin(GL_LINES);
-            glVertex3f(pos.x(), pos.y(), pos.z());
-            glVertex3f(tip.x(), tip.y(), tip.z());
-            glEnd();
-
-            glBegin(GL_TRIANGLES);
-            glVertex3f(tip.x(), tip.y(), tip.z());
-            glVertex3f(head1.x(), head1.y(), head1.z());
-            glVertex3f(head2.x(), head2.y(), head2.z());
-            glEnd();
+            Vec3f head1 = tip - fwd * headSize + side * headSize * 0.5f;
+            Vec3f head2 = tip - fwd * headSize - side * headSize * 0.5f;
+
+            addVertex(listenerArrowLines_, pos, 1, 1, 1, alpha);
+            addVertex(listenerArrowLines_, tip, 1, 1, 1, alpha);
+            addVertex(listenerArrowHeads_, tip, 1, 1, 1, alpha);
+            addVertex(listenerArrowHeads_, head1, 1, 1, 1, alpha);
+            addVertex(listenerArrowHeads_, head2, 1, 1, 1, alpha);
         }
     }
 
+    glEnableClientState(GL_VERTEX_ARRAY);
+    glEnableClientState(GL_COLOR_ARRAY);
+    auto drawBatch = [this](const MarkerBatch& batch, GLenum mode) {
+        if (batch.vertices.empty()) return;
+        glVertexPointer(3, GL_FLOAT, 0, batch.vertices.data());
+        glColorPointer(4, GL_FLOAT, 0, batch.colors.data());
+        glDrawArrays(mode, 0, static_cast<GLsizei>(batch.vertices.size() / 3));
+    };
+    drawBatch(markerFill_, GL_TRIANGLES);
+    glLineWidth(2);
+    drawBatch(markerThinLines_, GL_LINES);
+    glLineWidth(3);
+    drawBatch(markerThickLines_, GL_LINES);
+    glLineWidth(4);
+    drawBatch(listenerArrowLines_, GL_LINES);
+    drawBatch(listenerArrowHeads_, GL_TRIANGLES);
+    glDisableClientState(GL_COLOR_ARRAY);
+    glDisableClientState(GL_VERTEX_ARRAY);
+
     if (transparentMode_)
         glEnable(GL_DEPTH_TEST);
     else
@@ -768,39 +1017,55 @@ void Viewport3D::drawPointMarkers() {
     glDisable(GL_BLEND);
 }
 
+void Viewport3D::buildSurfaceOutlines() {
+    const auto& triIndices = mesh_.triangleIndices();
+    const auto& verts = mesh_.uniqueVertices();
+
+    // An edge is on a surface's outline if only one of the surface's
+    // triangles uses it, or if it is a feature edge
+    outlineVertices_.clear();
+    surfaceFirstOutlineVertex_.assign(1, 0);
+    std::vector<uint64_t> keys;
+    for (const auto& surface : surfaces_) {
+        keys.clear();
+        for (int ti : surface) {
+            const auto& idx = triIndices[ti];
+            for (int j = 0; j < 3; ++j)
+                keys.push_back(MeshData::edgeKey(idx[j], idx[(j + 1) % 3]));
+        }
+        std::sort(keys.begin(), keys.end());
+
+        for (size_t i = 0; i < keys.size();) {
+            size_t j = i + 1;
+            while (j < keys.size() && keys[j] == keys[i]) ++j;
+            if (j - i == 1 || featureEdges_.count(keys[i])) {
+                const Vec3f& a = verts[MeshData::edgeKeyFirst(keys[i])];
+                const Vec3f& b = verts[MeshData::edgeKeySecond(keys[i])];
+                outlineVertices_.insert(outlineVertices_.end(), {a.x(), a.y(), a.z(), b.x(), b.y(), b.z()});
+            }
+            i = j;
+        }
+        surfaceFirstOutlineVertex_.push_back(static_cast<int>(outlineVertices_.size() / 3));
+    }
+}
+
 void Viewport3D::drawSelectedSurfaceOutline() {
     if (selectedSurfaceIndex_ < 0) return;
 
     glPushMatrix();
-    camera_.applyViewMatrix();
-    glScalef(scaleFactor_, scaleFactor_, scaleFactor_);
-    glTranslatef(-modelCenter_.x(), -modelCenter_.y(), -modelCenter_.z());
+    applyModelViewMatrix();
 
     glDisable(GL_TEXTURE_2D);
     glDisable(GL_DEPTH_TEST);
     glColor4f(1, 1, 1, 1);
     glLineWidth(3);
 
-    const auto& tris = mesh_.triangles();
-    auto& surface = surfaces_[selectedSurfaceIndex_];
-
-    std::map<Edge, int> edgeCount;
-    for (int ti : surface) {
-        const Vec3f* verts[3] = {&tris[ti].v0, &tris[ti].v1, &tris[ti].v2};
-        for (int j = 0; j < 3; ++j) {
-            Edge e = makeEdge(*verts[j], *verts[(j + 1) % 3]);
-            edgeCount[e]++;
-        }
-    }
-
-    glBegin(GL_LINES);
-    for (auto& [edge, count] : edgeCount) {
-        if (count == 1 || featureEdges_.count(edge)) {
-            glVertex3f(std::get<0>(edge.first), std::get<1>(edge.first), std::get<2>(edge.first));
-            glVertex3f(std::get<0>(edge.second), std::get<1>(edge.second), std::get<2>(edge.second));
-        }
-    }
-    glEnd();
+    int first = surfaceFirstOutlineVertex_[selectedSurfaceIndex_];
+    int count = surfaceFirstOutlineVertex_[selectedSurfaceIndex_ + 1] - first;
+    glEnableClientState(GL_VERTEX_ARRAY);
+    glVertexPointer(3, GL_FLOAT, 0, outlineVertices_.data());
+    glDrawArrays(GL_LINES, first, count);
+    glDisableClientState(GL_VERTEX_ARRAY);
 
     glEnable(GL_DEPTH_TEST);
     glPopMatrix();
@@ -808,48 +1073,44 @@ void Viewport3D::drawSelectedSurfaceOutline() {
 
 // ==================== Ray Picking ====================
 
-std::pair<Vec3f, Vec3f> Viewport3D::getRayFromMouse(const QPoint& pos) {
-    GLint viewport[4];
-    GLdouble modelview[16], projection[16];
-    glGetIntegerv(GL_VIEWPORT, viewport);
-    glGetDoublev(GL_MODELVIEW_MATRIX, modelview);
-    glGetDoublev(GL_PROJECTION_MATRIX, projection);
-
-    double mx = pos.x();
-    double my = viewport[3] - pos.y();
-
-    GLdouble nx, ny, nz, fx, fy, fz;
-    gluUnProject(mx, my, 0.0, modelview, projection, viewport, &nx, &ny, &nz);
-    gluUnProject(mx, my, 1.0, modelview, projection, viewport, &fx, &fy, &fz);
-
-    Vec3f origin(nx, ny, nz);
-    Vec3f dir = Vec3f(fx - nx, fy - ny, fz - nz).normalized();
+std::pair<Vec3f, Vec3f> Viewport3D::getRayFromMouse(const QPoint& pos) const {
+    // Unproject through the cached matrices straight into model space, so
+    // the ray can be tested against the unscaled mesh without touching GL.
+    float w = std::max(width(), 1);
+    float h = std::max(height(), 1);
+    float ndcX = 2.0f * pos.x() / w - 1.0f;
+    float ndcY = 1.0f - 2.0f * pos.y() / h;
+
+    // Inverted in double like gluUnProject; the far/near ratio is large.
+    // Consecutive picks (hover, point dragging) usually share the same MVP.
+    Mat4f mvp = projection_ * camera_.viewMatrix() * modelMatrix_;
+    if (mvp != pickMvp_) {
+        pickMvp_ = mvp;
+        pickInvMvp_ = mvp.cast<double>().inverse();
+    }
+    const Eigen::Matrix4d& invMvp = pickInvMvp_;
+    Eigen::Vector4d nearPt = invMvp * Eigen::Vector4d(ndcX, ndcY, -1.0, 1.0);
+    Eigen::Vector4d farPt  = invMvp * Eigen::Vector4d(ndcX, ndcY,  1.0, 1.0);
+
+    Eigen::Vector3d nearPos = nearPt.head<3>() / nearPt.w();
+    Eigen::Vector3d farPos  = farPt.head<3>() / farPt.w();
+    Vec3f origin = nearPos.cast<float>();
+    Vec3f dir = (farPos - nearPos).normalized().cast<float>();
     return {origin, dir};
 }
 
 std::optional<Viewport3D::IntersectionResult> Viewport3D::getIntersectionPoint(const QPoint& pos) {
-    makeCurrent();
-    glPushMatrix();
-    camera_.applyViewMatrix();
-    glScalef(scaleFactor_, scaleFactor_, scaleFactor_);
-    glTranslatef(-modelCenter_.x(), -modelCenter_.y(), -modelCenter_.z());
+    if (!rect().contains(pos)) return std::nullopt;
 
     auto [rayOrigin, rayDir] = getRayFromMouse(pos);
-    glPopMatrix();
-    doneCurrent();
 
     const auto& tris = mesh_.triangles();
-    float minT = std::numeric_limits<float>::max();
-    int hitIdx = -1;
-
-    for (int i = 0; i < static_cast<int>(tris.size()); ++i) {
-        auto t = RayPicking::rayTriangleIntersect(rayOrigin, rayDir, tris[i]);
-        if (t && *t < minT) { minT = *t; hitIdx = i; }
-    }
+    BvhHit hit = pickBvh_->closestHit(rayOrigin, rayDir, 0.0f);
+    int hitIdx = hit.wallIndex;
 
     if (hitIdx < 0) return std::nullopt;
 
-    Vec3f hitPoint = rayOrigin + rayDir * minT;
+    Vec3f hitPoint = rayOrigin + rayDir * hit.t;
     Vec3f normal = tris[hitIdx].normal.normalized();
     if (normal.dot(rayOrigin - hitPoint) < 0) normal = -normal;
 
@@ -857,28 +1118,19 @@ std::optional<Viewport3D::IntersectionResult> Viewport3D::getIntersectionPoint(c
 }
 
 std::optional<int> Viewport3D::getPointAtMouse(const QPoint& pos) {
-    if (placedPoints_.empty()) return std::nullopt;
-
-    makeCurrent();
-    glPushMatrix();
-    camera_.applyViewMatrix();
-    glScalef(scaleFactor_, scaleFactor_, scaleFactor_);
-    glTranslatef(-modelCenter_.x(), -modelCenter_.y(), -modelCenter_.z());
+    if (placedPoints_.empty() || !rect().contains(pos)) return std::nullopt;
 
     auto [rayOrigin, rayDir] = getRayFromMouse(pos);
-    glPopMatrix();
-    doneCurrent();
 
     float markerRadius = (markerSize_ / 100.0f) / scaleFactor_;
     float hitRadius    = std::max(0.48f / scaleFactor_, markerRadius * 1.8f);
-    float minT = std::numeric_limits<float>::max();
-    int hitIdx = -1;
 
-    for (int i = 0; i < static_cast<int>(placedPoints_.size()); ++i) {
-        auto t = RayPicking::raySphereIntersect(
-            rayOrigin, rayDir, placedPoints_[i].getPosition(), hitRadius);
-        if (t && *t < minT) { minT = *t; hitIdx = i; }
-    }
+    // Gather positions into a contiguous array so the sphere tests stream
+    // through plain floats instead of striding over PlacedPoint records
+    pointPositions_.resize(placedPoints_.size());
+    for (size_t i = 0; i < placedPoints_.size(); ++i)
+        pointPositions_[i] = placedPoints_[i].getPosition();
+    int hitIdx = RayPicking::closestSphereHit(rayOrigin, rayDir, pointPositions_, hitRadius);
 
     if (hitIdx >= 0) return hitIdx;
     return std::nullopt;
@@ -894,29 +1146,16 @@ bool Viewport3D::trySelectPointAtMouse(const QPoint& pos) {
 }
 
 bool Viewport3D::trySelectSurfaceAtMouse(const QPoint& pos) {
-    makeCurrent();
-    glPushMatrix();
-    camera_.applyViewMatrix();
-    glScalef(scaleFactor_, scaleFactor_, scaleFactor_);
-    glTranslatef(-modelCenter_.x(), -modelCenter_.y(), -modelCenter_.z());
-
-    auto [rayOrigin, rayDir] = getRayFromMouse(pos);
-    glPopMatrix();
-    doneCurrent();
-
-    const auto& tris = mesh_.triangles();
-    float minT = std::numeric_limits<float>::max();
     int hitTri = -1;
-
-    for (int i = 0; i < static_cast<int>(tris.size()); ++i) {
-        auto t = RayPicking::rayTriangleIntersect(rayOrigin, rayDir, tris[i]);
-        if (t && *t < minT) { minT = *t; hitTri = i; }
+    if (rect().contains(pos)) {
+        auto [rayOrigin, rayDir] = getRayFromMouse(pos);
+        hitTri = pickBvh_->closestHit(rayOrigin, rayDir, 0.0f).wallIndex;
     }
 
     if (hitTri >= 0) {
-        auto it = triangleToSurface_.find(hitTri);
-        if (it != triangleToSurface_.end()) {
-            selectedSurfaceIndex_ = it->second;
+        int surfIdx = triangleToSurface_[hitTri];
+        if (surfIdx >= 0) {
+            selectedSurfaceIndex_ = surfIdx;
             activePointIndex_ = -1;
             emit surfaceSelected(selectedSurfaceIndex_);
             return true;
@@ -984,9 +1223,9 @@ void Viewport3D::mouseReleaseEvent(QMouseEvent* event) {
         }
 
         QPoint delta = event->pos() - mouseDownPos_;
-        float dragDist = std::sqrt(delta.x() * delta.x() + delta.y() * delta.y());
+        int dragDistSq = delta.x() * delta.x() + delta.y() * delta.y();
 
-        if (dragDist < 5 && hasModel()) {
+        if (dragDistSq < 5 * 5 && hasModel()) {
             if (measureMode_) {
                 auto hit = getIntersectionPoint(event->pos());
                 if (hit) {
@@ -1039,8 +1278,8 @@ void Viewport3D::wheelEvent(QWheelEvent* event) {
         adjustActivePointDistance(delta > 0 ? 0.1f : -0.1f);
     } else {
         camera_.zoom(delta, getRealWorldSize());
+        update();
     }
-    update();
     QOpenGLWidget::wheelEvent(event);
 }
 
@@ -1053,6 +1292,7 @@ void Viewport3D::keyPressEvent(QKeyEvent* event) {
     case Qt::Key_R:
         surfaceColors_.assign(surfaces_.size(), defaultSurfaceColor_);
         surfaceTextured_.assign(surfaces_.size(), false);
+        modelColorsDirty_ = true;
         update();
         break;
     case Qt::Key_P:
@@ -1124,9 +1364,9 @@ void Viewport3D::dropEvent(QDropEvent* event) {
     QPoint dropPos = event->position().toPoint();
     auto hit = getIntersectionPoint(dropPos);
     if (hit) {
-        auto it = triangleToSurface_.find(hit->triIndex);
-        if (it != triangleToSurface_.end()) {
-            assignMaterial(it->second, mat);
+        int surfIdx = triangleToSurface_[hit->triIndex];
+        if (surfIdx >= 0) {
+            assignMaterial(surfIdx, mat);
             event->acceptProposedAction();
         }
     }
@@ -19,18 +19,20 @@
 
 #include <vector>
 #include <set>
-#include <map>
 #include <optional>
 #include <functional>
+#include <memory>
 
 namespace prs {
 
+class Bvh;
+
 class Viewport3D : public QOpenGLWidget, protected QOpenGLFunctions {
     Q_OBJECT
 
 public:
     explicit Viewport3D(QWidget* parent = nullptr);
-    ~Viewport3D() override = default;
+    ~Viewport3D() override;
 
     bool loadModel(const QString& filepath);
     bool hasModel() const { return mesh_.triangleCount() > 0; }
@@ -96,7 +98,7 @@ public:
     Vec3f getScaledRoomCenter() const;
     std::vector<Vec3f> getScaledModelVertices() const;
 
-    const std::vector<std::set<int>>& surfaces() const { return surfaces_; }
+    const std::vector<std::vector<int>>& surfaces() const { return surfaces_; }
     const std::vector<Color3f>& surfaceColors() const { return surfaceColors_; }
 
     // Display settings
@@ -151,17 +153,27 @@ protected:
 
 private:
     void autoNormalizeScale();
+    void applyScaleFactor(float factor);
     void updateProjection();
+    void computeProjection(float aspect);
+    void updateModelMatrix();
+    void applyModelViewMatrix();
 
     // Drawing helpers
+    void buildModelBuffers();
+    void updateModelColors(float alpha);
+    void updateSurfaceColors(int surfIdx);
+    void buildGridVertices();
+    void buildSurfaceOutlines();
     void drawMeasurementGrid();
     void drawModel();
+    void drawSurfaceRange(int firstSurface, int lastSurface);
     void drawPointMarkers();
     void drawSelectedSurfaceOutline();
     void drawPlaceholder();
 
     // Ray picking
-    std::pair<Vec3f, Vec3f> getRayFromMouse(const QPoint& pos);
+    std::pair<Vec3f, Vec3f> getRayFromMouse(const QPoint& pos) const;
     struct IntersectionResult { Vec3f point; Vec3f normal; int triIndex; };
     std::optional<IntersectionResult> getIntersectionPoint(const QPoint& pos);
     std::optional<int> getPointAtMouse(const QPoint& pos);
@@ -175,17 +187,63 @@ private:
     float scaleFactor_ = 1.0f;
     float originalSize_ = 0.0f;
     Vec3f modelCenter_ = Vec3f::Zero();
+    Mat4f modelMatrix_ = Mat4f::Identity();
+    Mat4f projection_ = Mat4f::Identity();
+    // Inverse of the last MVP used for picking, reused until the MVP changes
+    mutable Mat4f pickMvp_ = Mat4f::Zero();
+    mutable Eigen::Matrix4d pickInvMvp_ = Eigen::Matrix4d::Identity();
+    std::unique_ptr<Bvh> pickBvh_;
 
     // Surface grouping
     SurfaceGrouper::EdgeSet featureEdges_;
-    std::vector<std::set<int>> surfaces_;
+    std::vector<std::vector<int>> surfaces_;
     std::vector<Color3f> surfaceColors_;
     std::vector<std::optional<Material>> surfaceMaterials_;
     std::vector<bool> surfaceTextured_;
-    std::map<int, int> triangleToSurface_;
+    std::vector<int> triangleToSurface_;  // triangle index -> surface index
+
+    // Indexed model buffers, ordered surface by surface so each surface is
+    // one contiguous vertex range [surfaceFirstVertex_[s], surfaceFirstVertex_[s+1])
+    // and one contiguous index range [surfaceFirstIndex_[s], surfaceFirstIndex_[s+1])
+    GLuint modelVertexBuffer_ = 0;
+    GLuint modelTexCoordBuffer_ = 0;
+    GLuint modelColorBuffer_ = 0;
+    GLuint modelIndexBuffer_ = 0;
+    GLuint featureEdgeBuffer_ = 0;
+    int featureEdgeVertexCount_ = 0;
+    std::vector<int> surfaceFirstVertex_;
+    std::vector<int> surfaceFirstIndex_;
+    std::vector<float> modelColors_;
+    bool modelBuffersDirty_ = true;
+    bool modelColorsDirty_ = true;
+    std::vector<int> pendingColorSurfaces_;
+    float modelColorsAlpha_ = -1.0f;
+
+    // Per-frame point marker geometry, reused to avoid reallocating
+    struct MarkerBatch {
+        std::vector<float> vertices;
+        std::vector<float> colors;
+        void clear() { vertices.clear(); colors.clear(); }
+    };
+    MarkerBatch markerFill_;
+    MarkerBatch markerThinLines_;
+    MarkerBatch markerThickLines_;
+    MarkerBatch listenerArrowLines_;
+    MarkerBatch listenerArrowHeads_;
+
+    // Selected-surface outline line vertices, surface s occupies
+    // [surfaceFirstOutlineVertex_[s], surfaceFirstOutlineVertex_[s+1])
+    std::vector<float> outlineVertices_;
+    std::vector<int> surfaceFirstOutlineVertex_;
+
+    // Measurement grid line vertices, rebuilt when scale, spacing or model change
+    std::vector<float> gridMinorVertices_;
+    std::vector<float> gridMajorVertices_;
+    bool gridDirty_ = true;
 
     // Points
     std::vector<PlacedPoint> placedPoints_;
+    std::vector<Vec3f> pointPositions_;  // scratch for batched point picking
     int activePointIndex_ = -1;
     bool placementMode_ = false;
     int nextPointColorIndex_ = 0;
@@ -83,9 +83,11 @@ bool SceneManager::hasMinimumObjects() const {
 
 std::pair<std::vector<Vec3f>, std::vector<Vec3f>> SceneManager::getAllPositions() const {
     std::vector<Vec3f> srcPos, lstPos;
+    srcPos.reserve(soundSources_.size());
+    lstPos.reserve(listeners_.size());
     for (auto& s : soundSources_) srcPos.push_back(s.position);
     for (auto& l : listeners_)    lstPos.push_back(l.position);
-    return {srcPos, lstPos};
+    return {std::move(srcPos), std::move(lstPos)};
 }
 
 void SceneManager::selectSource(int index) {
@@ -173,7 +175,12 @@ void SceneManager::loadFromFile(const QString& filepath) {
 
     clearAll();
 
-    for (auto val : root["sound_sources"].toArray()) {
+    const QJsonArray srcArr = root["sound_sources"].toArray();
+    const QJsonArray lstArr = root["listeners"].toArray();
+    soundSources_.reserve(srcArr.size());
+    listeners_.reserve(lstArr.size());
+
+    for (auto val : srcArr) {
         auto obj = val.toObject();
         SoundSource s;
         s.position  = jsonToVec3(obj["position"].toArray());
@@ -186,7 +193,7 @@ void SceneManager::loadFromFile(const QString& filepath) {
         soundSources_.push_back(std::move(s));
     }
 
-    for (auto val : root["listeners"].toArray()) {
+    for (auto val : lstArr) {
         auto obj = val.toObject();
         Listener l;
         l.position = jsonToVec3(obj["position"].toArray());
@@ -3,6 +3,7 @@
 #include <QDir>
 #include "acoustics/Wall.h"
 #include "acoustics/Bvh.h"
+#include "rendering/RayPicking.h"
 #include "acoustics/ImageSourceMethod.h"
 #include "acoustics/RayTracer.h"
 #include "acoustics/RoomImpulseResponse.h"
@@ -97,6 +98,35 @@ private slots:
             QVERIFY(img.delay > 0.0f);
     }
 
+    void testBvhTriangleClosestHitMatchesBruteForce() {
+        auto walls = createSimpleBox(5.0f);
+        std::vector<Triangle> tris;
+        for (auto& w : walls) tris.push_back(w.triangle);
+
+        Bvh bvh;
+        bvh.build(tris);
+        QVERIFY(!bvh.empty());
+
+        Vec3f origin(1.5f, 2.0f, 3.0f);
+        for (int i = 0; i < 64; ++i) {
+            float theta = 0.37f * i, phi = 0.11f * i;
+            Vec3f dir(std::cos(theta) * std::sin(phi + 0.2f),
+                      std::sin(theta) * std::sin(phi + 0.2f),
+                      std::cos(phi + 0.2f));
+            dir.normalize();
+
+            float bestT = std::numeric_limits<float>::max();
+            for (auto& tri : tris) {
+                auto t = RayPicking::rayTriangleIntersect(origin, dir, tri);
+                if (t && *t < bestT) bestT = *t;
+            }
+
+            BvhHit hit = bvh.closestHit(origin, dir, 0.0f);
+            QVERIFY(hit.wallIndex >= 0);
+            QVERIFY(std::abs(hit.t - bestT) < 1e-4f);
+        }
+    }
+
     void testRayTracerSimpleBox() {
         auto walls = createSimpleBox(5.0f);
         Vec3f source(2.5f, 2.5f, 2.5f);
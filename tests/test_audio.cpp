@@ -1,5 +1,7 @@
 #include <QtTest/QtTest>
 #include <QTemporaryFile>
+#include <cmath>
+#include <random>
 #include "audio/AudioFile.h"
 #include "audio/SignalProcessing.h"
 
@@ -30,6 +32,26 @@ private slots:
         QVERIFY(loaded.samples().size() == 1000);
     }
 
+    void testLoadTruncatedWav() {
+        AudioFile af;
+        af.samples().assign(1000, 0.25f);
+
+        QTemporaryFile tmp;
+        tmp.setAutoRemove(true);
+        tmp.setFileTemplate(QDir::tempPath() + "/testXXXXXX.wav");
+        QVERIFY(tmp.open());
+        QString path = tmp.fileName();
+        tmp.close();
+
+        QVERIFY(af.save(path, 44100));
+        // Header still claims 1000 samples, but only part of the data remains
+        QVERIFY(QFile::resize(path, 44 + 2 * 300 + 1));
+
+        AudioFile loaded;
+        QVERIFY(loaded.load(path));
+        QCOMPARE(loaded.samples().size(), size_t(300));
+    }
+
     void testMonoConversion() {
         AudioFile af;
         std::vector<float> stereo(200);
@@ -76,6 +98,60 @@ private slots:
         QVERIFY(std::abs(result[2] - 3.0f) < 1e-4f);
         QVERIFY(std::abs(result[3] - 4.0f) < 1e-4f);
     }
+
+    void testFftConvolveMatchesDirect() {
+        const int fs = 44100;
+        std::vector<float> sine(fs / 4);
+        for (size_t i = 0; i < sine.size(); ++i)
+            sine[i] = 0.8f * std::sin(2.0f * static_cast<float>(M_PI) * 440.0f * i / fs);
+
+        // Dense decaying tail and sparse decaying reflections
+        std::mt19937 rng(7);
+        std::uniform_real_distribution<float> noise(-1.0f, 1.0f);
+        std::vector<float> denseRir(6000), sparseRir(6000, 0.0f);
+        for (size_t i = 0; i < denseRir.size(); ++i)
+            denseRir[i] = noise(rng) * std::exp(-static_cast<float>(i) / 1200.0f);
+        denseRir[0] = 1.0f;
+        for (size_t i = 0; i < sparseRir.size(); i += 613)
+            sparseRir[i] = std::exp(-static_cast<float>(i) / 3000.0f);
+
+        for (const auto* rir : {&denseRir, &sparseRir}) {
+            auto fast = SignalProcessing::fftConvolve(sine, *rir);
+            auto direct = SignalProcessing::convolve(sine, *rir);
+            QCOMPARE(fast.size(), direct.size());
+
+            float peak = 0.0f, maxErr = 0.0f;
+            for (size_t i = 0; i < direct.size(); ++i) {
+                peak = std::max(peak, std::abs(direct[i]));
+                maxErr = std::max(maxErr, std::abs(fast[i] - direct[i]));
+            }
+            QVERIFY(maxErr < 1e-5f * peak);
+        }
+    }
+
+    void testFftConvolveLengths() {
+        // Odd, tiny and power-of-two lengths, alternating transform sizes
+        std::mt19937 rng(11);
+        std::uniform_real_distribution<float> noise(-1.0f, 1.0f);
+        const std::pair<size_t, size_t> lengths[] = {
+            {1, 1}, {2, 1}, {1, 3}, {5, 3}, {64, 64}, {1000, 333}, {4096, 1}, {777, 3001}};
+        for (const auto& [n, m] : lengths) {
+            std::vector<float> a(n), b(m);
+            for (float& v : a) v = noise(rng);
+            for (float& v : b) v = noise(rng);
+
+            auto fast = SignalProcessing::fftConvolve(a, b);
+            auto direct = SignalProcessing::convolve(a, b);
+            QCOMPARE(fast.size(), n + m - 1);
+
+            float peak = 0.0f, maxErr = 0.0f;
+            for (size_t i = 0; i < direct.size(); ++i) {
+                peak = std::max(peak, std::abs(direct[i]));
+                maxErr = std::max(maxErr, std::abs(fast[i] - direct[i]));
+            }
+            QVERIFY(maxErr <= 1e-5f * peak);
+        }
+    }
 };
 
 QTEST_MAIN(TestAudio)
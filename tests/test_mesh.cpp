@@ -121,6 +121,31 @@ private slots:
         QCOMPARE(totalTris, 12);
     }
 
+    void testWeldedTopologyBox() {
+        QTemporaryFile tmp;
+        tmp.setAutoRemove(true);
+        tmp.setFileTemplate(QDir::tempPath() + "/testXXXXXX.stl");
+        QVERIFY(tmp.open());
+        tmp.write(createBoxSTL());
+        tmp.close();
+
+        MeshData mesh;
+        QVERIFY(mesh.loadSTL(tmp.fileName()));
+        QCOMPARE(static_cast<int>(mesh.uniqueVertices().size()), 8);
+        QCOMPARE(static_cast<int>(mesh.triangleIndices().size()), 12);
+        QCOMPARE(static_cast<int>(mesh.edgeUses().size()), 36);
+
+        const auto& tri = mesh.triangles()[0];
+        const auto& idx = mesh.triangleIndices()[0];
+        QCOMPARE(mesh.vertexIndex(tri.v0), idx[0]);
+        QCOMPARE(mesh.vertexIndex(tri.v2), idx[2]);
+        QCOMPARE(mesh.vertexIndex(Vec3f(5, 5, 5)), -1);
+
+        QCOMPARE(MeshData::edgeKey(3, 7), MeshData::edgeKey(7, 3));
+        QCOMPARE(MeshData::edgeKeyFirst(MeshData::edgeKey(7, 3)), 3);
+        QCOMPARE(MeshData::edgeKeySecond(MeshData::edgeKey(7, 3)), 7);
+    }
+
     void testIsClosedBox() {
         QTemporaryFile tmp;
         tmp.setAutoRemove(true);
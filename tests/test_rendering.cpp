@@ -1,6 +1,8 @@
 #include <QtTest/QtTest>
+#include <array>
 #include "rendering/Camera.h"
 #include "rendering/RayPicking.h"
+#include "rendering/VertexCacheOptimizer.h"
 
 using namespace prs;
 
@@ -37,6 +39,23 @@ private slots:
         QVERIFY(cam.distance() > 0);
     }
 
+    void testCameraViewMatrix() {
+        Camera cam;
+        cam.setDistance(7.0f);
+        cam.orbit(13, -40);
+
+        Vec3f eye = cam.eyePosition();
+        Vec4f eyeView = cam.viewMatrix() * Vec4f(eye.x(), eye.y(), eye.z(), 1.0f);
+        QVERIFY(eyeView.head<3>().norm() < 1e-4f);
+
+        Vec4f target = cam.viewMatrix() * Vec4f(0, 0, 0, 1);
+        QVERIFY(std::abs(target.z() + 7.0f) < 1e-4f);
+
+        cam.setDistance(3.0f);
+        target = cam.viewMatrix() * Vec4f(0, 0, 0, 1);
+        QVERIFY(std::abs(target.z() + 3.0f) < 1e-4f);
+    }
+
     void testRayTriangleHit() {
         Triangle tri;
         tri.v0 = Vec3f(0, 0, 0);
@@ -78,6 +97,49 @@ private slots:
         auto t = RayPicking::raySphereIntersect(origin, dir, Vec3f(10, 10, 0), 1.0f);
         QVERIFY(!t.has_value());
     }
+
+    void testClosestSphereHit() {
+        Vec3f origin(0, 0, 5);
+        Vec3f dir(0, 0, -1);
+        std::vector<Vec3f> centers = {Vec3f(10, 10, 0), Vec3f(0, 0, -2), Vec3f(0, 0, 1)};
+        QCOMPARE(RayPicking::closestSphereHit(origin, dir, centers, 0.5f), 2);
+        QCOMPARE(RayPicking::closestSphereHit(origin, -dir, centers, 0.5f), -1);
+        QCOMPARE(RayPicking::closestSphereHit(origin, dir, {}, 0.5f), -1);
+    }
+
+    void testVertexCacheOptimizerGrid() {
+        // 32x32 quad grid with triangles submitted in a scattered order
+        const int n = 32;
+        std::vector<uint32_t> indices;
+        for (int k = 0; k < n * n; ++k) {
+            int cell = (k * 389) % (n * n);
+            uint32_t a = (cell / n) * (n + 1) + cell % n, b = a + 1, c = a + n + 1, d = c + 1;
+            indices.insert(indices.end(), {a, b, d, a, d, c});
+        }
+        const int vertexCount = (n + 1) * (n + 1);
+
+        auto canonical = [](const std::vector<uint32_t>& idx) {
+            std::vector<std::array<uint32_t, 3>> tris;
+            for (size_t i = 0; i < idx.size(); i += 3) {
+                std::array<uint32_t, 3> t = {idx[i], idx[i + 1], idx[i + 2]};
+                std::rotate(t.begin(), std::min_element(t.begin(), t.end()), t.end());
+                tris.push_back(t);
+            }
+            std::sort(tris.begin(), tris.end());
+            return tris;
+        };
+
+        std::vector<uint32_t> optimized = indices;
+        VertexCacheOptimizer::optimize(optimized, vertexCount);
+        QVERIFY(canonical(optimized) == canonical(indices));
+        QVERIFY(VertexCacheOptimizer::acmr(optimized) < 0.5f * VertexCacheOptimizer::acmr(indices));
+
+        std::vector<uint32_t> renumbered = optimized;
+        auto remap = VertexCacheOptimizer::reorderVertices(renumbered, vertexCount);
+        QCOMPARE(renumbered[0], 0u);
+        for (size_t i = 0; i < optimized.size(); ++i)
+            QCOMPARE(renumbered[i], static_cast<uint32_t>(remap[optimized[i]]));
+    }
 };
 
 QTEST_MAIN(TestRendering)